@@ -16,6 +16,8 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -23,11 +25,19 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from licenses.cache import SCHEMA_CACHE_TIMEOUT
+
+# Generating the schema introspects every serializer and viewset, so cache it;
+# it is negotiated from the Accept header, so keep YAML and JSON apart
+schema_view = cache_page(SCHEMA_CACHE_TIMEOUT)(
+    vary_on_headers("Accept")(SpectacularAPIView.as_view())
+)
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("licenses.urls")),
     # API Documentation
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", schema_view, name="schema"),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -1,12 +1,87 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from .admin_paginators import ApproxCountPaginator
 from .models import Activation, Brand, License, LicenseKey, Product
+from .querysets import count_subquery
+
+# Related-object filter sidebars are allowed to be this many seconds stale
+RELATED_FILTER_CACHE_TIMEOUT = 300
+
+
+class ProjectedChangeList(ChangeList):
+    """ChangeList that only loads the columns named in ``list_only_fields``."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        only_fields = self.model_admin.list_only_fields
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        return queryset
+
+
+class ListOnlyFieldsMixin:
+    """
+    Restrict changelist queries to the fields the list columns need.
+
+    Only the changelist is projected; change and delete views still load full
+    rows through ``get_queryset``.
+    """
+
+    list_only_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList
+
+
+class CachedRelatedFilter(admin.RelatedFieldListFilter):
+    """Foreign-key filter whose ``(pk, label)`` choices are cached."""
+
+    cache_key = None
+
+    def load_choices(self):
+        """Return the filter choices as a list of ``(pk, label)`` pairs."""
+        raise NotImplementedError
+
+    def field_choices(self, field, request, model_admin):
+        choices = cache.get(self.cache_key)
+        if choices is None:
+            choices = self.load_choices()
+            cache.set(self.cache_key, choices, RELATED_FILTER_CACHE_TIMEOUT)
+        return choices
+
+
+class CachedBrandFilter(CachedRelatedFilter):
+    """Brand filter shared by every changelist that filters on a brand."""
+
+    cache_key = "admin:licenses:brand_choices"
+
+    def load_choices(self):
+        return list(Brand.objects.order_by("name").values_list("pk", "name"))
+
+
+class CachedProductFilter(CachedRelatedFilter):
+    """Product filter that lists only licensed products."""
+
+    cache_key = "admin:licenses:product_choices"
+
+    def load_choices(self):
+        products = (
+            Product.objects.filter(pk__in=License.objects.values("product_id"))
+            .select_related("brand")
+            .only("name", "brand__name")
+            .order_by("brand__name", "name")
+        )
+        return [(product.pk, str(product)) for product in products]
 
 
 @admin.register(Brand)
-class BrandAdmin(admin.ModelAdmin):
+class BrandAdmin(ListOnlyFieldsMixin, admin.ModelAdmin):
     """Admin interface for Brand model."""
 
     list_display = ("name", "slug", "is_active", "product_count", "created_at")
@@ -14,33 +89,60 @@ class BrandAdmin(admin.ModelAdmin):
     search_fields = ("name", "slug", "description")
     prepopulated_fields = {"slug": ("name",)}
     ordering = ("name",)
+    list_only_fields = ("id", "name", "slug", "is_active", "created_at")
+
+    def get_queryset(self, request):
+        """Annotate product counts to avoid a COUNT query per row."""
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(_product_count=count_subquery(Product, "brand_id"))
+        )
 
     def product_count(self, obj):
         """Display count of products for this brand."""
-        return obj.products.count()
+        return obj._product_count
 
     product_count.short_description = _("Products")
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ListOnlyFieldsMixin, admin.ModelAdmin):
     """Admin interface for Product model."""
 
     list_display = ("name", "brand", "slug", "is_active", "license_count", "created_at")
-    list_filter = ("brand", "is_active", "created_at")
+    list_select_related = ("brand",)
+    list_filter = (("brand", CachedBrandFilter), "is_active", "created_at")
     search_fields = ("name", "slug", "description", "brand__name")
     prepopulated_fields = {"slug": ("name",)}
+    autocomplete_fields = ("brand",)
     ordering = ("brand__name", "name")
+    list_only_fields = (
+        "id",
+        "name",
+        "slug",
+        "is_active",
+        "created_at",
+        "brand__name",
+    )
+
+    def get_queryset(self, request):
+        """Annotate license counts to avoid a COUNT query per row."""
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(_license_count=count_subquery(License, "product_id"))
+        )
 
     def license_count(self, obj):
         """Display count of licenses for this product."""
-        return obj.licenses.count()
+        return obj._license_count
 
     license_count.short_description = _("Licenses")
 
 
 @admin.register(LicenseKey)
-class LicenseKeyAdmin(admin.ModelAdmin):
+class LicenseKeyAdmin(ListOnlyFieldsMixin, admin.ModelAdmin):
     """Admin interface for LicenseKey model."""
 
     list_display = (
@@ -51,27 +153,46 @@ class LicenseKeyAdmin(admin.ModelAdmin):
         "license_count",
         "created_at",
     )
-    list_filter = ("brand", "is_active", "created_at")
+    list_select_related = ("brand",)
+    list_filter = (("brand", CachedBrandFilter), "is_active", "created_at")
     search_fields = ("key", "customer_email", "brand__name")
     readonly_fields = ("key", "created_at", "updated_at")
+    autocomplete_fields = ("brand",)
     ordering = ("-created_at",)
+    list_only_fields = (
+        "id",
+        "key",
+        "customer_email",
+        "is_active",
+        "created_at",
+        "brand__name",
+    )
+    show_full_result_count = False
+    paginator = ApproxCountPaginator
+
+    def get_queryset(self, request):
+        """Annotate license counts to avoid a COUNT query per row."""
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(_license_count=count_subquery(License, "license_key_id"))
+        )
 
     def key_display(self, obj):
         """Display truncated license key."""
-        key_str = str(obj.key)
-        return format_html("<code>{}</code>", key_str[:20] + "...")
+        return format_html("<code>{}...</code>", str(obj.key)[:20])
 
     key_display.short_description = _("License Key")
 
     def license_count(self, obj):
         """Display count of licenses for this key."""
-        return obj.licenses.count()
+        return obj._license_count
 
     license_count.short_description = _("Licenses")
 
 
 @admin.register(License)
-class LicenseAdmin(admin.ModelAdmin):
+class LicenseAdmin(ListOnlyFieldsMixin, admin.ModelAdmin):
     """Admin interface for License model."""
 
     list_display = (
@@ -84,10 +205,11 @@ class LicenseAdmin(admin.ModelAdmin):
         "expiration_date",
         "is_expired_display",
     )
+    list_select_related = ("license_key", "product", "product__brand")
     list_filter = (
         "status",
-        "product__brand",
-        "product",
+        ("product", CachedProductFilter),
+        ("product__brand", CachedBrandFilter),
         "expiration_date",
         "created_at",
     )
@@ -97,7 +219,21 @@ class LicenseAdmin(admin.ModelAdmin):
         "product__brand__name",
     )
     readonly_fields = ("created_at", "updated_at")
+    autocomplete_fields = ("license_key", "product")
     ordering = ("-created_at",)
+    list_only_fields = (
+        "id",
+        "status",
+        "seats",
+        "expiration_date",
+        "created_at",
+        "license_key__key",
+        "license_key__customer_email",
+        "product__name",
+        "product__brand__name",
+    )
+    show_full_result_count = False
+    paginator = ApproxCountPaginator
 
     fieldsets = (
         (
@@ -118,6 +254,21 @@ class LicenseAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        """Join display relations and annotate seats and expiry for each row."""
+        now = timezone.now()
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("license_key", "product__brand")
+            .with_used_seats()
+            .annotate(
+                _is_expired=ExpressionWrapper(
+                    Q(expiration_date__lt=now), output_field=BooleanField()
+                )
+            )
+        )
+
     def customer_email(self, obj):
         """Display customer email from license key."""
         return obj.license_key.customer_email
@@ -126,14 +277,13 @@ class LicenseAdmin(admin.ModelAdmin):
 
     def license_key_display(self, obj):
         """Display truncated license key."""
-        key_str = str(obj.license_key.key)
-        return format_html("<code>{}</code>", key_str[:15] + "...")
+        return format_html("<code>{}...</code>", str(obj.license_key.key)[:15])
 
     license_key_display.short_description = _("License Key")
 
     def is_expired_display(self, obj):
         """Display expired status with color coding."""
-        if obj.is_expired:
+        if obj._is_expired:
             return format_html('<span style="color: red;">{}</span>', _("Expired"))
         return format_html('<span style="color: green;">{}</span>', _("Active"))
 
@@ -141,7 +291,7 @@ class LicenseAdmin(admin.ModelAdmin):
 
 
 @admin.register(Activation)
-class ActivationAdmin(admin.ModelAdmin):
+class ActivationAdmin(ListOnlyFieldsMixin, admin.ModelAdmin):
     """Admin interface for Activation model."""
 
     list_display = (
@@ -155,7 +305,7 @@ class ActivationAdmin(admin.ModelAdmin):
     list_filter = (
         "is_active",
         "instance_type",
-        "license__product__brand",
+        ("license__product__brand", CachedBrandFilter),
         "activated_at",
     )
     search_fields = (
@@ -164,7 +314,20 @@ class ActivationAdmin(admin.ModelAdmin):
         "license__license_key__customer_email",
     )
     readonly_fields = ("activated_at", "deactivated_at", "updated_at")
+    autocomplete_fields = ("license",)
     ordering = ("-activated_at",)
+    list_only_fields = (
+        "id",
+        "instance_identifier",
+        "instance_type",
+        "is_active",
+        "activated_at",
+        "license__product__name",
+        "license__product__brand__name",
+        "license__license_key__customer_email",
+    )
+    show_full_result_count = False
+    paginator = ApproxCountPaginator
 
     fieldsets = (
         (
@@ -187,6 +350,14 @@ class ActivationAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        """Join the license, product, brand and key used by the display columns."""
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("license__product__brand", "license__license_key")
+        )
+
     def license_display(self, obj):
         """Display license information."""
         return f"{obj.license.product.name} ({obj.license.product.brand.name})"
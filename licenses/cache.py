@@ -0,0 +1,148 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+# Related-object counts are allowed to be this many seconds stale
+COUNT_CACHE_TIMEOUT = 60
+
+# License status check responses are allowed to be this many seconds stale
+STATUS_CACHE_TIMEOUT = 30
+
+# The generated OpenAPI schema only changes when the code is deployed
+SCHEMA_CACHE_TIMEOUT = 60 * 15
+
+# Product ids by slug are invalidated on every product change; the timeout
+# only bounds how long updates that bypass signals stay visible
+PRODUCT_IDS_CACHE_TIMEOUT = 60 * 5
+
+PRODUCT_IDS_VERSION_KEY = "product_ids:version"
+
+
+def count_cache_key(model_name, pk, relation):
+    """Build the cache key for the number of ``relation`` rows of an object."""
+    return f"{model_name}:{pk}:{relation}"
+
+
+def get_cached_count(obj, relation):
+    """Return ``getattr(obj, relation).count()``, cached for a short TTL."""
+    key = count_cache_key(obj._meta.model_name, obj.pk, relation)
+    count = cache.get(key)
+    if count is None:
+        count = getattr(obj, relation).count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_cached_count(model_name, pk, relation):
+    """Drop a cached related-object count."""
+    cache.delete(count_cache_key(model_name, pk, relation))
+
+
+def prime_cached_counts(objs, relation):
+    """
+    Fill the cached ``relation`` counts of many objects of one model at once.
+
+    Counts that are already cached are left alone; the rest are loaded with a
+    single grouped query so serializers do not count per object.
+    """
+    objs = {obj.pk: obj for obj in objs}
+    if not objs:
+        return
+    model = next(iter(objs.values()))._meta.model
+    keys = {count_cache_key(model._meta.model_name, pk, relation): pk for pk in objs}
+    cached = cache.get_many(keys)
+    missing = [pk for key, pk in keys.items() if key not in cached]
+    if not missing:
+        return
+
+    fk_name = model._meta.get_field(relation).field.attname
+    related_model = model._meta.get_field(relation).related_model
+    counts = dict(
+        related_model.objects.filter(**{f"{fk_name}__in": missing})
+        .order_by()
+        .values_list(fk_name)
+        .annotate(count=Count("*"))
+    )
+    cache.set_many(
+        {
+            count_cache_key(model._meta.model_name, pk, relation): counts.get(pk, 0)
+            for pk in missing
+        },
+        COUNT_CACHE_TIMEOUT,
+    )
+
+
+def status_cache_key(license_key, product_slug=None, instance_identifier=None):
+    """Build the cache key for one license status check."""
+    raw = "|".join(
+        str(part or "") for part in (license_key, product_slug, instance_identifier)
+    )
+    return f"license_status:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def _status_version_key(license_key_id):
+    return f"licensekey:{license_key_id}:status_version"
+
+
+def get_status_version(license_key_id):
+    """Return the current status cache version of a license key."""
+    return cache.get(_status_version_key(license_key_id), 0)
+
+
+def get_cached_status(cache_key):
+    """Return a cached status response, or None if missing or invalidated."""
+    entry = cache.get(cache_key)
+    if entry is None:
+        return None
+    license_key_id, version, data = entry
+    if get_status_version(license_key_id) != version:
+        return None
+    return data
+
+
+def set_cached_status(cache_key, license_key_id, version, data):
+    """
+    Cache a status response built from state read at ``version``.
+
+    Read the version before querying so that a change committed while the
+    response was being built leaves the entry already invalidated.
+    """
+    cache.set(cache_key, (license_key_id, version, data), STATUS_CACHE_TIMEOUT)
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_cached_status(license_key_id):
+    """
+    Invalidate every cached status response of a license key.
+
+    The version is bumped again on commit, because a status check running
+    concurrently could cache the pre-commit state in between.
+    """
+    key = _status_version_key(license_key_id)
+    _bump_version(key)
+    transaction.on_commit(lambda: _bump_version(key))
+
+
+def product_ids_cache_key(slug):
+    """
+    Build the cache key for the product ids of a slug at the current version.
+
+    Build the key before querying, for the same reason as the status version.
+    """
+    version = cache.get(PRODUCT_IDS_VERSION_KEY, 0)
+    digest = hashlib.sha256(slug.encode()).hexdigest()
+    return f"product_ids:{version}:{digest}"
+
+
+def invalidate_product_ids():
+    """Invalidate the cached product ids of every slug."""
+    _bump_version(PRODUCT_IDS_VERSION_KEY)
+    transaction.on_commit(lambda: _bump_version(PRODUCT_IDS_VERSION_KEY))
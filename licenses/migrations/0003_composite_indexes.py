@@ -0,0 +1,42 @@
+# Generated by Django 5.1.2 on 2026-10-14 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("licenses", "0002_activation_deactivation_reason_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="activation",
+            name="activations_is_acti_ae5a13_idx",
+        ),
+        migrations.AddIndex(
+            model_name="activation",
+            index=models.Index(
+                fields=["license", "is_active"], name="activations_license_5b9a24_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activation",
+            index=models.Index(
+                fields=["instance_identifier", "is_active"],
+                name="activations_instanc_dc40b1_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="license",
+            index=models.Index(
+                fields=["license_key", "status"], name="licenses_license_5a9496_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="license",
+            index=models.Index(
+                fields=["product", "status", "expiration_date"],
+                name="licenses_product_b09e11_idx",
+            ),
+        ),
+    ]
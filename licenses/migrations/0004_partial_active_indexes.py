@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-14 05:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, a plain CREATE INDEX elsewhere."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("licenses", "0003_composite_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name="activation",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["license"],
+                name="act_active_by_license",
+            ),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name="license",
+            index=models.Index(
+                condition=models.Q(("status", "valid")),
+                fields=["license_key"],
+                name="lic_valid_by_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-14 06:00
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("licenses", "0004_partial_active_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="licensekey",
+            name="key",
+            field=models.UUIDField(
+                default=uuid.uuid4,
+                editable=False,
+                help_text="Unique license key identifier",
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_customer_emails(apps, schema_editor):
+    LicenseKey = apps.get_model("licenses", "LicenseKey")
+    LicenseKey.objects.exclude(customer_email=Lower("customer_email")).update(
+        customer_email=Lower("customer_email")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("licenses", "0005_license_key_uuid"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_customer_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Columns searched by the brand and product ``search_fields``. SearchFilter
+# uses ``icontains``, which PostgreSQL renders as ``UPPER(col::text) LIKE``,
+# so the trigram indexes are built on that expression.
+SEARCH_COLUMNS = {
+    "brands": ("name", "slug", "description"),
+    "products": ("name", "slug", "description"),
+}
+
+
+def index_name(table, column):
+    return f"{table}_{column}_trgm"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            schema_editor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"{index_name(table, column)} ON {table} "
+                f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            schema_editor.execute(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(table, column)}"
+            )
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("licenses", "0006_lowercase_customer_emails"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
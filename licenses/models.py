@@ -1,11 +1,29 @@
 import logging
 import uuid
 
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import (
+    F,
+    IntegerField,
+    Prefetch,
+    Q,
+    Sum,
+    Value,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .cache import (
+    PRODUCT_IDS_CACHE_TIMEOUT,
+    invalidate_cached_status,
+    product_ids_cache_key,
+)
+from .querysets import count_subquery
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,16 +97,36 @@ class Product(models.Model):
         return f"{self.brand.name} - {self.name}"
 
 
+class LicenseKeyQuerySet(models.QuerySet):
+    """QuerySet helpers for LicenseKey."""
+
+    def with_licenses(self):
+        """
+        Join the brand and prefetch licenses with products and used seats.
+
+        The prefetch points each license back at its already loaded key, so
+        joining ``license_key`` there would only widen the SELECT.
+        """
+        return self.select_related("brand").prefetch_related(
+            Prefetch(
+                "licenses",
+                queryset=License.objects.select_related(
+                    "product__brand"
+                ).with_used_seats(),
+            )
+        )
+
+
 class LicenseKey(models.Model):
     """
     Represents a license key that can unlock multiple licenses.
     This is the main identifier that end users receive.
     """
 
-    key = models.CharField(
-        max_length=255,
+    key = models.UUIDField(
         unique=True,
         default=uuid.uuid4,
+        editable=False,
         help_text=_("Unique license key identifier"),
     )
 
@@ -108,6 +146,8 @@ class LicenseKey(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LicenseKeyQuerySet.as_manager()
+
     class Meta:
         db_table = "license_keys"
         ordering = ["-created_at"]
@@ -117,6 +157,11 @@ class LicenseKey(models.Model):
             models.Index(fields=["is_active"]),
         ]
 
+    def save(self, *args, **kwargs):
+        # Store emails lowercased so lookups can use the plain index
+        self.customer_email = self.customer_email.lower()
+        super().save(*args, **kwargs)
+
     def __str__(self):
         key_str = str(self.key)
         return f"{key_str[:8]}... ({self.customer_email})"
@@ -127,7 +172,30 @@ class LicenseKey(models.Model):
 
     def get_total_seats(self):
         """Get total seats across all licenses."""
-        return sum(license.seats for license in self.licenses.all())
+        return self.licenses.aggregate(total=Sum("seats"))["total"] or 0
+
+    def get_available_seats(self):
+        """Get available seats across all licenses in a single query."""
+        available = Greatest(
+            F("seats") - count_subquery(Activation, "license_id", is_active=True),
+            Value(0),
+            output_field=IntegerField(),
+        )
+        return self.licenses.aggregate(total=Sum(available))["total"] or 0
+
+
+class LicenseQuerySet(models.QuerySet):
+    """QuerySet helpers for License."""
+
+    def with_used_seats(self):
+        """Annotate the number of active activations as ``_used_seats``."""
+        return self.annotate(
+            _used_seats=count_subquery(Activation, "license_id", is_active=True)
+        )
+
+    def with_related(self):
+        """Join the key, product and both of their brands."""
+        return self.select_related("license_key__brand", "product__brand")
 
 
 class License(models.Model):
@@ -202,6 +270,8 @@ class License(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LicenseQuerySet.as_manager()
+
     class Meta:
         db_table = "licenses"
         ordering = ["-created_at"]
@@ -209,6 +279,13 @@ class License(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["expiration_date"]),
             models.Index(fields=["product"]),
+            models.Index(fields=["license_key", "status"]),
+            models.Index(fields=["product", "status", "expiration_date"]),
+            models.Index(
+                fields=["license_key"],
+                condition=Q(status="valid"),
+                name="lic_valid_by_key",
+            ),
         ]
 
     def __str__(self):
@@ -221,80 +298,152 @@ class License(models.Model):
 
     @property
     def available_seats(self):
-        """Calculate available seats."""
-        used_seats = self.activations.filter(is_active=True).count()
+        """
+        Calculate available seats.
+
+        Uses the ``with_used_seats()`` annotation or prefetched activations
+        when present, and only falls back to a COUNT query otherwise.
+        """
+        used_seats = getattr(self, "_used_seats", None)
+        if used_seats is None:
+            if "activations" in getattr(self, "_prefetched_objects_cache", {}):
+                used_seats = sum(1 for a in self.activations.all() if a.is_active)
+            else:
+                used_seats = self.activations.filter(is_active=True).count()
         return max(0, self.seats - used_seats)
 
+    def _transition(self, action, from_statuses, **values):
+        """
+        Apply ``values`` with one conditional UPDATE guarded on the status.
+
+        The row is only updated if its status is still one of ``from_statuses``
+        in the database, so concurrent transitions cannot both succeed.
+        Plain values are mirrored onto the instance after the update.
+        """
+        updated = 0
+        if self.status in from_statuses:
+            values["updated_at"] = timezone.now()
+            updated = (
+                type(self)
+                .objects.filter(pk=self.pk, status__in=from_statuses)
+                .update(**values)
+            )
+            if not updated:
+                self.refresh_from_db(fields=["status"])
+
+        if not updated:
+            raise ValueError(f"Cannot {action} license with status: {self.status}")
+        # update() bypasses post_save, so drop cached status checks here
+        invalidate_cached_status(self.license_key_id)
+
+        for field, value in values.items():
+            if not hasattr(value, "resolve_expression"):
+                setattr(self, field, value)
+
     def renew(self, new_expiration_date, reason=None):
         """Renew the license with a new expiration date."""
-
-        if self.status not in ["valid", "expired"]:
-            raise ValueError(f"Cannot renew license with status: {self.status}")
-
-        # Store original expiration date if this is the first renewal
-        if not self.original_expiration_date:
-            self.original_expiration_date = self.expiration_date
-
-        self.expiration_date = new_expiration_date
+        original_expiration_date = self.original_expiration_date or self.expiration_date
+        self._transition(
+            "renew",
+            ["valid", "expired"],
+            # Keep the original expiration date from the first renewal
+            original_expiration_date=Coalesce(
+                F("original_expiration_date"), F("expiration_date")
+            ),
+            expiration_date=new_expiration_date,
+            renewal_count=F("renewal_count") + 1,
+            status="renewed",
+        )
+        self.original_expiration_date = original_expiration_date
         self.renewal_count += 1
-        self.status = "renewed"
-        self.save()
 
         # Log the renewal
         logger.info(
-            f"License {self.id} renewed until {new_expiration_date} "
-            f"(renewal #{self.renewal_count})"
+            "License %s renewed until %s (renewal #%s)",
+            self.id,
+            new_expiration_date,
+            self.renewal_count,
         )
 
         return True
 
     def suspend(self, reason):
         """Suspend the license."""
-
-        if self.status not in ["valid", "renewed"]:
-            raise ValueError(f"Cannot suspend license with status: {self.status}")
-
-        self.status = "suspended"
-        self.suspension_reason = reason
-        self.suspended_at = timezone.now()
-        self.save()
+        self._transition(
+            "suspend",
+            ["valid", "renewed"],
+            status="suspended",
+            suspension_reason=reason,
+            suspended_at=timezone.now(),
+        )
 
         # Log the suspension
-        logger.info(f"License {self.id} suspended: {reason}")
+        logger.info("License %s suspended: %s", self.id, reason)
 
         return True
 
     def resume(self):
         """Resume a suspended license."""
-        if self.status != "suspended":
-            raise ValueError(f"Cannot resume license with status: {self.status}")
-
-        self.status = "valid"
-        self.suspension_reason = ""
-        self.suspended_at = None
-        self.save()
+        self._transition(
+            "resume",
+            ["suspended"],
+            status="valid",
+            suspension_reason="",
+            suspended_at=None,
+        )
 
         # Log the resumption
-        logger.info(f"License {self.id} resumed")
+        logger.info("License %s resumed", self.id)
 
         return True
 
     def cancel(self, reason):
         """Cancel the license."""
-
-        if self.status in ["cancelled", "expired"]:
-            raise ValueError(f"Cannot cancel license with status: {self.status}")
-
-        self.status = "cancelled"
-        self.cancellation_reason = reason
-        self.cancelled_at = timezone.now()
-        self.save()
+        self._transition(
+            "cancel",
+            [
+                status
+                for status, _label in self.STATUS_CHOICES
+                if status not in ["cancelled", "expired"]
+            ],
+            status="cancelled",
+            cancellation_reason=reason,
+            cancelled_at=timezone.now(),
+        )
 
         # Log the cancellation
-        logger.info(f"License {self.id} cancelled: {reason}")
+        logger.info("License %s cancelled: %s", self.id, reason)
 
         return True
 
+    @classmethod
+    def bulk_expire(cls, now=None):
+        """
+        Expire every valid or renewed license past its expiration date.
+
+        Runs as a single UPDATE, so ``save()`` and model signals are not
+        triggered for the affected rows. Returns the number of licenses expired.
+        """
+        now = now or timezone.now()
+        expired_count = cls.objects.filter(
+            expiration_date__lt=now, status__in=["valid", "renewed"]
+        ).update(status="expired", updated_at=timezone.now())
+
+        # Log the expiry sweep
+        logger.info("Expired %s licenses past %s", expired_count, now)
+
+        return expired_count
+
+
+class ActivationQuerySet(models.QuerySet):
+    """QuerySet helpers for Activation."""
+
+    def with_related(self):
+        """Join the license with its key, product and both of their brands."""
+        return self.select_related(
+            "license__license_key__brand", "license__product__brand"
+        )
+
 
 class Activation(models.Model):
     """
@@ -331,13 +480,21 @@ class Activation(models.Model):
     )
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ActivationQuerySet.as_manager()
+
     class Meta:
         db_table = "activations"
         ordering = ["-activated_at"]
         indexes = [
             models.Index(fields=["instance_identifier"]),
-            models.Index(fields=["is_active"]),
             models.Index(fields=["license"]),
+            models.Index(fields=["license", "is_active"]),
+            models.Index(fields=["instance_identifier", "is_active"]),
+            models.Index(
+                fields=["license"],
+                condition=Q(is_active=True),
+                name="act_active_by_license",
+            ),
         ]
         unique_together = ["license", "instance_identifier"]
 
@@ -349,12 +506,86 @@ class Activation(models.Model):
         self.is_active = False
         self.deactivated_at = timezone.now()
         self.deactivation_reason = reason or ""
-        self.save()
+        self.save(
+            update_fields=[
+                "is_active",
+                "deactivated_at",
+                "deactivation_reason",
+                "updated_at",
+            ]
+        )
 
         # Log the deactivation
         logger.info(
-            f"Activation {self.id} deactivated for instance "
-            f"{self.instance_identifier}: {reason or 'No reason provided'}"
+            "Activation %s deactivated for instance %s: %s",
+            self.id,
+            self.instance_identifier,
+            reason or "No reason provided",
         )
 
         return True
+
+    @classmethod
+    def bulk_deactivate(cls, activations, reason=None):
+        """
+        Deactivate every active activation in ``activations``.
+
+        Runs as a single UPDATE, so ``save()`` and model signals are not
+        triggered for the affected rows. Returns the number of activations
+        deactivated.
+        """
+        now = timezone.now()
+        activations = activations.filter(is_active=True)
+        license_key_ids = set(
+            activations.values_list("license__license_key_id", flat=True)
+        )
+        deactivated_count = activations.update(
+            is_active=False,
+            deactivated_at=now,
+            deactivation_reason=reason or "",
+            updated_at=now,
+        )
+        # update() bypasses post_save, so drop cached status checks here
+        for license_key_id in license_key_ids:
+            invalidate_cached_status(license_key_id)
+
+        # Log the bulk deactivation
+        logger.info(
+            "Bulk deactivated %s activations: %s",
+            deactivated_count,
+            reason or "No reason provided",
+        )
+
+        return deactivated_count
+
+
+def bulk_refresh_seat_counts(licenses):
+    """
+    Prefetch active activations for many licenses in a single query.
+
+    Pass the whole list at once rather than calling this per license, so that
+    ``License.available_seats`` reads the prefetched cache for every item.
+    """
+    prefetch_related_objects(
+        licenses,
+        Prefetch("activations", queryset=Activation.objects.filter(is_active=True)),
+    )
+    return licenses
+
+
+def product_ids_by_slug(slug):
+    """
+    Return the ids of the products with ``slug``, from the shared cache.
+
+    Slugs are only unique per brand, so several ids may match. Filtering
+    licenses on these ids avoids joining products on every status check.
+    Every product save or delete invalidates the cached ids in all workers.
+    """
+    key = product_ids_cache_key(slug)
+    product_ids = cache.get(key)
+    if product_ids is None:
+        product_ids = tuple(
+            Product.objects.filter(slug=slug).values_list("id", flat=True)
+        )
+        cache.set(key, product_ids, PRODUCT_IDS_CACHE_TIMEOUT)
+    return product_ids
@@ -0,0 +1,24 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, fk_name, **filters):
+    """
+    Build a correlated COUNT subquery over ``model`` rows pointing at the outer row.
+
+    Unlike ``Count()`` on a reverse relation this does not JOIN the related
+    table into the outer query, so several counts can be annotated on the same
+    queryset without multiplying rows.
+    """
+    subquery = (
+        model.objects.filter(**{fk_name: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(fk_name)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(
+        Subquery(subquery, output_field=IntegerField()),
+        Value(0),
+        output_field=IntegerField(),
+    )
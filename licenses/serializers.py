@@ -1,11 +1,43 @@
+import uuid
+
 from django.utils import timezone
 
 from rest_framework import serializers
 
+from .cache import get_cached_count
 from .models import Activation, Brand, License, LicenseKey, Product
 
 
-class BrandSerializer(serializers.ModelSerializer):
+def future_validator(value):
+    """Reject datetimes that are not in the future."""
+    if value <= timezone.now():
+        raise serializers.ValidationError("Expiration date must be in the future.")
+
+
+def requested_fields(request):
+    """Return the field names picked with ``?fields=a,b``, or None for all."""
+    if request is None or request.method != "GET":
+        return None
+    raw = getattr(request, "query_params", {}).get("fields", "")
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    return names or None
+
+
+class SparseFieldsMixin:
+    """Limit a top-level serializer's output to the ``?fields=`` selection."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        names = requested_fields(self.context.get("request"))
+        if parent is not None or names is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in names}
+
+
+class BrandSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Brand model."""
 
     product_count = serializers.SerializerMethodField()
@@ -24,10 +56,10 @@ class BrandSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
     def get_product_count(self, obj):
-        return obj.products.count()
+        return get_cached_count(obj, "products")
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Product model."""
 
     brand = BrandSerializer(read_only=True)
@@ -50,10 +82,10 @@ class ProductSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
     def get_license_count(self, obj):
-        return obj.licenses.count()
+        return get_cached_count(obj, "licenses")
 
 
-class LicenseKeySerializer(serializers.ModelSerializer):
+class LicenseKeySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for LicenseKey model."""
 
     brand = BrandSerializer(read_only=True)
@@ -75,7 +107,7 @@ class LicenseKeySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "key", "created_at"]
 
     def get_license_count(self, obj):
-        return obj.licenses.count()
+        return get_cached_count(obj, "licenses")
 
 
 class LicenseSerializer(serializers.ModelSerializer):
@@ -118,18 +150,37 @@ class LicenseSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "available_seats", "is_expired", "created_at"]
+        extra_kwargs = {"expiration_date": {"validators": [future_validator]}}
 
-    def validate(self, data):
-        """Validate license data."""
-        # Check if expiration date is in the future
-        if "expiration_date" in data and data["expiration_date"] <= timezone.now():
-            raise serializers.ValidationError("Expiration date must be in the future.")
 
-        # Check if seats is positive
-        if "seats" in data and data["seats"] <= 0:
-            raise serializers.ValidationError("Seats must be a positive number.")
+class LicenseListSerializer(serializers.ModelSerializer):
+    """Flat read-only serializer for License list endpoints."""
 
-        return data
+    customer_email = serializers.CharField(
+        source="license_key.customer_email", read_only=True
+    )
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    brand_name = serializers.CharField(source="product.brand.name", read_only=True)
+    available_seats = serializers.ReadOnlyField()
+    is_expired = serializers.ReadOnlyField()
+
+    class Meta:
+        model = License
+        fields = [
+            "id",
+            "license_key_id",
+            "customer_email",
+            "product_id",
+            "product_name",
+            "brand_name",
+            "status",
+            "seats",
+            "available_seats",
+            "expiration_date",
+            "is_expired",
+            "created_at",
+        ]
+        read_only_fields = fields
 
 
 class ActivationSerializer(serializers.ModelSerializer):
@@ -160,13 +211,11 @@ class ActivationSerializer(serializers.ModelSerializer):
 
         if license_obj and instance_identifier:
             # Check if activation already exists for this license and instance
-            existing_activation = Activation.objects.filter(
+            if Activation.objects.filter(
                 license_id=license_obj,
                 instance_identifier=instance_identifier,
                 is_active=True,
-            ).first()
-
-            if existing_activation:
+            ).exists():
                 raise serializers.ValidationError(
                     "An active activation already exists for this license and instance."
                 )
@@ -174,7 +223,7 @@ class ActivationSerializer(serializers.ModelSerializer):
         return data
 
 
-class LicenseKeyDetailSerializer(serializers.ModelSerializer):
+class LicenseKeyDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Detailed serializer for LicenseKey with all related licenses."""
 
     brand = BrandSerializer(read_only=True)
@@ -196,11 +245,23 @@ class LicenseKeyDetailSerializer(serializers.ModelSerializer):
             "created_at",
         ]
 
+    def _prefetched_licenses(self, obj):
+        """Return prefetched licenses, or None if they were not prefetched."""
+        if "licenses" in getattr(obj, "_prefetched_objects_cache", {}):
+            return obj.licenses.all()
+        return None
+
     def get_total_seats(self, obj):
+        licenses = self._prefetched_licenses(obj)
+        if licenses is not None:
+            return sum(license.seats for license in licenses)
         return obj.get_total_seats()
 
     def get_active_seats(self, obj):
-        return sum(license.available_seats for license in obj.licenses.all())
+        licenses = self._prefetched_licenses(obj)
+        if licenses is not None:
+            return sum(license.available_seats for license in licenses)
+        return obj.get_available_seats()
 
 
 class LicenseStatusSerializer(serializers.Serializer):
@@ -212,29 +273,22 @@ class LicenseStatusSerializer(serializers.Serializer):
 
     def validate_license_key(self, value):
         """Validate license key format."""
-        if not value or len(value) < 10:
+        try:
+            return uuid.UUID(value)
+        except ValueError:
             raise serializers.ValidationError("Invalid license key format.")
-        return value
 
 
 class LicenseRenewalSerializer(serializers.Serializer):
     """Serializer for license renewal requests."""
 
     new_expiration_date = serializers.DateTimeField(
-        help_text="New expiration date for the license"
+        validators=[future_validator], help_text="New expiration date for the license"
     )
     reason = serializers.CharField(
         max_length=500, required=False, help_text="Reason for renewal"
     )
 
-    def validate_new_expiration_date(self, value):
-        """Validate that new expiration date is in the future."""
-        if value <= timezone.now():
-            raise serializers.ValidationError(
-                "New expiration date must be in the future."
-            )
-        return value
-
 
 class LicenseSuspensionSerializer(serializers.Serializer):
     """Serializer for license suspension requests."""
@@ -268,6 +322,27 @@ class LicenseActivationSerializer(serializers.Serializer):
 
     def validate_license_key(self, value):
         """Validate license key format."""
-        if not value or len(value) < 10:
+        try:
+            return uuid.UUID(value)
+        except ValueError:
             raise serializers.ValidationError("Invalid license key format.")
-        return value
+
+
+class LicenseProvisionSerializer(serializers.Serializer):
+    """Serializer for one license in a bulk provisioning request."""
+
+    customer_email = serializers.EmailField()
+    brand_id = serializers.IntegerField()
+    product_id = serializers.IntegerField()
+    seats = serializers.IntegerField(min_value=1, default=1)
+    expiration_date = serializers.DateTimeField(validators=[future_validator])
+
+    def validate_customer_email(self, value):
+        """Lowercase the email, as license key emails are stored."""
+        return value.lower()
+
+
+class BulkLicenseProvisionSerializer(serializers.Serializer):
+    """Serializer for bulk license provisioning requests."""
+
+    licenses = LicenseProvisionSerializer(many=True, allow_empty=False)
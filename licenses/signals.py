@@ -0,0 +1,66 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    invalidate_cached_count,
+    invalidate_cached_status,
+    invalidate_product_ids,
+)
+from .models import Activation, License, LicenseKey, Product
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_brand_product_count(sender, instance, **kwargs):
+    """Invalidate the cached product count of the product's brand."""
+    invalidate_cached_count("brand", instance.brand_id, "products")
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_slug_ids(sender, instance, **kwargs):
+    """Invalidate cached product ids, since the product's slug may have changed."""
+    invalidate_product_ids()
+
+
+@receiver([post_save, post_delete], sender=License)
+def invalidate_license_counts(sender, instance, **kwargs):
+    """Invalidate the cached license counts of the license's product and key."""
+    invalidate_cached_count("product", instance.product_id, "licenses")
+    invalidate_cached_count("licensekey", instance.license_key_id, "licenses")
+
+
+@receiver([post_save, post_delete], sender=LicenseKey)
+def invalidate_license_key_status(sender, instance, **kwargs):
+    """Invalidate cached status checks of the license key."""
+    invalidate_cached_status(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=License)
+def invalidate_license_status(sender, instance, **kwargs):
+    """Invalidate cached status checks of the license's key."""
+    invalidate_cached_status(instance.license_key_id)
+
+
+def _activation_license_key_id(activation):
+    """Return the activation's license key id without loading the whole license."""
+    license = Activation.license.field.get_cached_value(activation, None)
+    if license is not None:
+        return license.license_key_id
+    return (
+        License.objects.filter(pk=activation.license_id)
+        .values_list("license_key_id", flat=True)
+        .first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Activation)
+def invalidate_activation_status(sender, instance, origin=None, **kwargs):
+    """Invalidate cached status checks of the activated license's key."""
+    if origin is not None:
+        model = origin.model if isinstance(origin, QuerySet) else type(origin)
+        if model is not Activation:
+            # A cascade from a license or key, whose receivers invalidate it
+            return
+    license_key_id = _activation_license_key_id(instance)
+    if license_key_id is not None:
+        invalidate_cached_status(license_key_id)
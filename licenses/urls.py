@@ -1,11 +1,11 @@
 from django.urls import include, path
 
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from . import views
 
 # Create router for ViewSets
-router = DefaultRouter()
+router = SimpleRouter()
 router.register(r"brands", views.BrandViewSet)
 router.register(r"products", views.ProductViewSet)
 router.register(r"license-keys", views.LicenseKeyViewSet)
@@ -18,10 +18,4 @@ app_name = "licenses"
 urlpatterns = [
     # Include router URLs
     path("api/", include(router.urls)),
-    # Additional custom endpoints
-    path(
-        "api/license-keys/by-email/",
-        views.LicenseKeyViewSet.as_view({"get": "by_email"}),
-        name="license-keys-by-email",
-    ),
 ]
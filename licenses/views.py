@@ -1,35 +1,250 @@
+import json
 import logging
+import uuid
+from collections.abc import Mapping
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.exceptions import ErrorDetail, PermissionDenied, ValidationError
+from rest_framework.fields import empty
 from rest_framework.response import Response
-
-from .models import Activation, Brand, License, LicenseKey, Product
+from rest_framework.settings import api_settings
+
+from .cache import (
+    get_cached_status,
+    get_status_version,
+    invalidate_cached_count,
+    invalidate_cached_status,
+    prime_cached_counts,
+    set_cached_status,
+    status_cache_key,
+)
+from .models import (
+    Activation,
+    Brand,
+    License,
+    LicenseKey,
+    Product,
+    bulk_refresh_seat_counts,
+    product_ids_by_slug,
+)
 from .serializers import (
     ActivationDeactivationSerializer,
     ActivationSerializer,
     BrandSerializer,
+    BulkLicenseProvisionSerializer,
     LicenseActivationSerializer,
     LicenseCancellationSerializer,
     LicenseKeyDetailSerializer,
     LicenseKeySerializer,
+    LicenseListSerializer,
     LicenseRenewalSerializer,
     LicenseSerializer,
     LicenseStatusSerializer,
     LicenseSuspensionSerializer,
     ProductSerializer,
+    requested_fields,
 )
 
 logger = logging.getLogger(__name__)
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+def prime_license_counts(licenses, brands=()):
+    """Load the nested serializer counts for many licenses up front."""
+    brands = list(brands)
+    brands += [license.license_key.brand for license in licenses]
+    brands += [license.product.brand for license in licenses]
+    prime_cached_counts(brands, "products")
+    prime_cached_counts([license.product for license in licenses], "licenses")
+    prime_cached_counts([license.license_key for license in licenses], "licenses")
+
+
+def prime_license_key_counts(license_keys):
+    """Load the nested serializer counts for many license keys up front."""
+    licenses = [license for key in license_keys for license in key.licenses.all()]
+    prime_license_counts(licenses, brands=[key.brand for key in license_keys])
+
+
+def prime_activation_counts(activations):
+    """Load the nested license seats and counts for many activations up front."""
+    licenses = [activation.license for activation in activations]
+    bulk_refresh_seat_counts(licenses)
+    prime_license_counts(licenses)
+
+
+def wants_field(request, name):
+    """Whether ``name`` is part of the ``?fields=`` selection of ``request``."""
+    fields = requested_fields(request)
+    return fields is None or name in fields
+
+
+# Rows fetched per database round trip when streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+
+def stream_license_export(email):
+    """
+    Yield a JSON array of a customer's keys and licenses, one row at a time.
+
+    Rows are read with a server-side cursor, so memory stays bounded by
+    ``EXPORT_CHUNK_SIZE`` however many licenses the customer holds.
+    """
+    rows = (
+        LicenseKey.objects.filter(customer_email=email)
+        .order_by("-created_at", "licenses__id")
+        .values(
+            "key",
+            "customer_email",
+            "brand__name",
+            "licenses__id",
+            "licenses__product__slug",
+            "licenses__status",
+            "licenses__seats",
+            "licenses__expiration_date",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + "\n" + json.dumps(row, cls=DjangoJSONEncoder)
+    yield "\n]\n"
+
+
+def service_request_rules(serializer_class):
+    """Read the flat string field rules of a service request serializer once."""
+    return [
+        (
+            name,
+            field.max_length,
+            field.required,
+            None if field.default is empty else field.default,
+        )
+        for name, field in serializer_class().fields.items()
+    ]
+
+
+STATUS_REQUEST_RULES = service_request_rules(LicenseStatusSerializer)
+ACTIVATION_REQUEST_RULES = service_request_rules(LicenseActivationSerializer)
+
+
+def _clean_service_field(value, max_length, required, default):
+    """
+    Return ``(value, error)`` for one field, following DRF's ``CharField``.
+
+    A missing key yields the default, while ``None`` and blank strings are
+    errors even for optional fields. A ``None`` value in the result means the
+    field is omitted.
+    """
+    if value is empty:
+        if required:
+            return None, ErrorDetail("This field is required.", "required")
+        return default, None
+    if value is None:
+        return None, ErrorDetail("This field may not be null.", "null")
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None, ErrorDetail("Not a valid string.", "invalid")
+    value = str(value).strip()
+    if not value:
+        return None, ErrorDetail("This field may not be blank.", "blank")
+    if max_length is not None and len(value) > max_length:
+        message = f"Ensure this field has no more than {max_length} characters."
+        return None, ErrorDetail(message, "max_length")
+    return value, None
+
+
+def validate_service_request(data, rules):
+    """
+    Validate a license service request against ``rules`` without a serializer.
+
+    The anonymous service endpoints are the hottest in the API, so they skip
+    building a serializer per request. Errors keep DRF's per-field shape.
+    """
+    if not isinstance(data, Mapping):
+        message = f"Invalid data. Expected a dictionary, but got {type(data).__name__}."
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+    validated = {}
+    errors = {}
+    for name, max_length, required, default in rules:
+        value, error = _clean_service_field(
+            data.get(name, empty), max_length, required, default
+        )
+        if error:
+            errors[name] = [error]
+        elif value is not None:
+            validated[name] = value
+
+    if "license_key" in validated:
+        try:
+            validated["license_key"] = uuid.UUID(validated["license_key"])
+        except ValueError:
+            errors["license_key"] = ["Invalid license key format."]
+
+    if errors:
+        raise ValidationError(errors)
+    return validated
+
+
+def _get_or_create_license_keys(customers):
+    """
+    Map each ``(customer_email, brand_id)`` pair to a license key.
+
+    Existing keys are loaded in one query, and the oldest key is reused when a
+    customer has several for a brand. The missing keys are created with a
+    single ``bulk_create``.
+    """
+    license_keys = {}
+    existing = LicenseKey.objects.filter(
+        customer_email__in={email for email, _ in customers},
+        brand_id__in={brand_id for _, brand_id in customers},
+    ).order_by("created_at")
+    for license_key in existing:
+        license_keys.setdefault(
+            (license_key.customer_email, license_key.brand_id), license_key
+        )
+
+    new_keys = LicenseKey.objects.bulk_create(
+        LicenseKey(customer_email=email, brand_id=brand_id)
+        for email, brand_id in customers
+        if (email, brand_id) not in license_keys
+    )
+    for license_key in new_keys:
+        license_keys[(license_key.customer_email, license_key.brand_id)] = license_key
+    return license_keys
+
+
+class AdminScopeMixin:
+    """Resolve the requesting user's admin scope and email once per request."""
+
+    def _is_admin(self):
+        """Return whether the request user is a license admin or staff member."""
+        request = self.request
+        is_admin = getattr(request, "_is_admin_cache", None)
+        if is_admin is None:
+            user = request.user
+            is_admin = bool(
+                user.is_authenticated and (user.is_license_admin or user.is_staff)
+            )
+            request._is_admin_cache = is_admin
+        return is_admin
+
+    def _user_email(self):
+        """Return the request user's email address."""
+        request = self.request
+        if not hasattr(request, "_user_email_cache"):
+            # License key emails are stored lowercased
+            request._user_email_cache = request.user.email.lower()
+        return request._user_email_cache
+
+
+class BrandViewSet(AdminScopeMixin, viewsets.ModelViewSet):
     """ViewSet for Brand management."""
 
     queryset = Brand.objects.all()
@@ -40,15 +255,22 @@ class BrandViewSet(viewsets.ModelViewSet):
     ordering_fields = ["name", "created_at"]
     ordering = ["name"]
 
+    def paginate_queryset(self, queryset):
+        """Prime the product counts for the brands on the current page."""
+        page = super().paginate_queryset(queryset)
+        if page is not None and wants_field(self.request, "product_count"):
+            prime_cached_counts(page, "products")
+        return page
+
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        if self.request.user.is_license_admin or self.request.user.is_staff:
+        if self._is_admin():
             return Brand.objects.all()
         # Regular users can only see active brands
         return Brand.objects.filter(is_active=True)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(AdminScopeMixin, viewsets.ModelViewSet):
     """ViewSet for Product management."""
 
     queryset = Product.objects.select_related("brand")
@@ -59,9 +281,19 @@ class ProductViewSet(viewsets.ModelViewSet):
     ordering_fields = ["name", "brand__name", "created_at"]
     ordering = ["brand__name", "name"]
 
+    def paginate_queryset(self, queryset):
+        """Prime the nested counts for the products on the current page."""
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            if wants_field(self.request, "brand"):
+                prime_cached_counts([product.brand for product in page], "products")
+            if wants_field(self.request, "license_count"):
+                prime_cached_counts(page, "licenses")
+        return page
+
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        if self.request.user.is_license_admin or self.request.user.is_staff:
+        if self._is_admin():
             return Product.objects.select_related("brand")
         # Regular users can only see active products from active brands
         return Product.objects.filter(
@@ -69,10 +301,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         ).select_related("brand")
 
 
-class LicenseKeyViewSet(viewsets.ModelViewSet):
+class LicenseKeyViewSet(AdminScopeMixin, viewsets.ModelViewSet):
     """ViewSet for LicenseKey management."""
 
-    queryset = LicenseKey.objects.select_related("brand").prefetch_related("licenses")
+    queryset = LicenseKey.objects.with_licenses()
     serializer_class = LicenseKeySerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["brand", "is_active", "customer_email"]
@@ -86,37 +318,63 @@ class LicenseKeyViewSet(viewsets.ModelViewSet):
             return LicenseKeyDetailSerializer
         return LicenseKeySerializer
 
+    def get_object(self):
+        """Prime nested serializer counts for the retrieved key."""
+        license_key = super().get_object()
+        if self.action == "retrieve":
+            prime_license_key_counts([license_key])
+        return license_key
+
+    def _needs_licenses(self):
+        """Whether the response reads the licenses of each key."""
+        if self.action != "list":
+            return True
+        return any(
+            wants_field(self.request, name)
+            for name in ("licenses", "total_seats", "active_seats")
+        )
+
+    def paginate_queryset(self, queryset):
+        """Prime nested serializer counts for the keys on the current page."""
+        page = super().paginate_queryset(queryset)
+        if page is None or self.action not in ("list", "by_email"):
+            return page
+        if self._needs_licenses():
+            prime_license_key_counts(page)
+        elif wants_field(self.request, "brand"):
+            prime_cached_counts([key.brand for key in page], "products")
+        return page
+
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        if self.request.user.is_license_admin or self.request.user.is_staff:
-            return LicenseKey.objects.select_related("brand").prefetch_related(
-                "licenses"
-            )
-        # Regular users can only see their own license keys
-        return (
-            LicenseKey.objects.filter(customer_email=self.request.user.email)
-            .select_related("brand")
-            .prefetch_related("licenses")
-        )
+        queryset = LicenseKey.objects.all()
+        if not self._is_admin():
+            # Regular users can only see their own license keys
+            queryset = queryset.filter(customer_email=self._user_email())
+        if self._needs_licenses():
+            return queryset.with_licenses()
+        return queryset.select_related("brand")
 
     @action(detail=False, methods=["get"])
     def by_email(self, request):
         """Get all licenses by customer email across all brands (US6)."""
-        if not (request.user.is_license_admin or request.user.is_staff):
+        if not self._is_admin():
             raise PermissionDenied("Only license admins can access this endpoint.")
 
         email = request.query_params.get("email")
         if not email:
             raise ValidationError("Email parameter is required.")
+        email = email.lower()
 
-        license_keys = (
-            LicenseKey.objects.filter(customer_email=email)
-            .select_related("brand")
-            .prefetch_related("licenses__product__brand")
-        )
+        if request.query_params.get("stream") == "1":
+            return StreamingHttpResponse(
+                stream_license_export(email), content_type="application/json"
+            )
 
-        serializer = LicenseKeyDetailSerializer(license_keys, many=True)
-        return Response(serializer.data)
+        license_keys = LicenseKey.objects.filter(customer_email=email).with_licenses()
+        page = self.paginate_queryset(license_keys.order_by("-created_at"))
+        serializer = LicenseKeyDetailSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 @extend_schema_view(
@@ -146,10 +404,10 @@ class LicenseKeyViewSet(viewsets.ModelViewSet):
         tags=["licenses"],
     ),
 )
-class LicenseViewSet(viewsets.ModelViewSet):
+class LicenseViewSet(AdminScopeMixin, viewsets.ModelViewSet):
     """ViewSet for License management."""
 
-    queryset = License.objects.select_related("license_key__brand", "product__brand")
+    queryset = License.objects.with_related()
     serializer_class = LicenseSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["status", "product", "license_key__brand"]
@@ -157,16 +415,39 @@ class LicenseViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "expiration_date"]
     ordering = ["-created_at"]
 
+    def get_serializer_class(self):
+        """Use the flat list serializer for list actions."""
+        if self.action == "list":
+            return LicenseListSerializer
+        return LicenseSerializer
+
+    # Columns read by LicenseListSerializer, including the FKs it traverses
+    list_only_fields = (
+        "id",
+        "license_key",
+        "license_key__customer_email",
+        "product",
+        "product__name",
+        "product__brand",
+        "product__brand__name",
+        "status",
+        "seats",
+        "expiration_date",
+        "created_at",
+    )
+
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        if self.request.user.is_license_admin or self.request.user.is_staff:
-            return License.objects.select_related(
-                "license_key__brand", "product__brand"
+        queryset = License.objects.with_used_seats()
+        if not self._is_admin():
+            # Regular users can only see their own licenses
+            queryset = queryset.filter(license_key__customer_email=self._user_email())
+
+        if self.action == "list":
+            return queryset.select_related("license_key", "product__brand").only(
+                *self.list_only_fields
             )
-        # Regular users can only see their own licenses
-        return License.objects.filter(
-            license_key__customer_email=self.request.user.email
-        ).select_related("license_key__brand", "product__brand")
+        return queryset.with_related()
 
     @extend_schema(
         summary="Renew a license",
@@ -200,8 +481,10 @@ class LicenseViewSet(viewsets.ModelViewSet):
             )
 
             logger.info(
-                f"License {license_obj.id} renewed by user {request.user.username} "
-                f"until {serializer.validated_data['new_expiration_date']}"
+                "License %s renewed by user %s until %s",
+                license_obj.id,
+                request.user.username,
+                serializer.validated_data["new_expiration_date"],
             )
 
             result_serializer = self.get_serializer(license_obj)
@@ -229,8 +512,10 @@ class LicenseViewSet(viewsets.ModelViewSet):
             license_obj.suspend(reason=serializer.validated_data["reason"])
 
             logger.info(
-                f"License {license_obj.id} suspended by user {request.user.username}: "
-                f"{serializer.validated_data['reason']}"
+                "License %s suspended by user %s: %s",
+                license_obj.id,
+                request.user.username,
+                serializer.validated_data["reason"],
             )
 
             result_serializer = self.get_serializer(license_obj)
@@ -256,7 +541,7 @@ class LicenseViewSet(viewsets.ModelViewSet):
             license_obj.resume()
 
             logger.info(
-                f"License {license_obj.id} resumed by user {request.user.username}"
+                "License %s resumed by user %s", license_obj.id, request.user.username
             )
 
             result_serializer = self.get_serializer(license_obj)
@@ -284,8 +569,10 @@ class LicenseViewSet(viewsets.ModelViewSet):
             license_obj.cancel(reason=serializer.validated_data["reason"])
 
             logger.info(
-                f"License {license_obj.id} cancelled by user {request.user.username}: "
-                f"{serializer.validated_data['reason']}"
+                "License %s cancelled by user %s: %s",
+                license_obj.id,
+                request.user.username,
+                serializer.validated_data["reason"],
             )
 
             result_serializer = self.get_serializer(license_obj)
@@ -305,31 +592,32 @@ class LicenseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def change_status(self, request, pk=None):
         """Change license status (legacy method - kept for backward compatibility)."""
-        license_obj = self.get_object()
         new_status = request.data.get("status")
-
         if new_status not in dict(License.STATUS_CHOICES):
             raise ValidationError("Invalid status value.")
 
+        license_obj = self.get_object()
+
         # Log the status change
         logger.info(
-            f"License {license_obj.id} status changed from {license_obj.status} "
-            f"to {new_status} by user {request.user.username}"
+            "License %s status changed from %s to %s by user %s",
+            license_obj.id,
+            license_obj.status,
+            new_status,
+            request.user.username,
         )
 
         license_obj.status = new_status
-        license_obj.save()
+        license_obj.save(update_fields=["status", "updated_at"])
 
         serializer = self.get_serializer(license_obj)
         return Response(serializer.data)
 
 
-class ActivationViewSet(viewsets.ModelViewSet):
+class ActivationViewSet(AdminScopeMixin, viewsets.ModelViewSet):
     """ViewSet for Activation management."""
 
-    queryset = Activation.objects.select_related(
-        "license__product__brand", "license__license_key"
-    )
+    queryset = Activation.objects.with_related()
     serializer_class = ActivationSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["is_active", "instance_type", "license__product__brand"]
@@ -337,16 +625,21 @@ class ActivationViewSet(viewsets.ModelViewSet):
     ordering_fields = ["activated_at"]
     ordering = ["-activated_at"]
 
+    def paginate_queryset(self, queryset):
+        """Prime nested seat and serializer counts for the current page."""
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            prime_activation_counts(page)
+        return page
+
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        if self.request.user.is_license_admin or self.request.user.is_staff:
-            return Activation.objects.select_related(
-                "license__product__brand", "license__license_key"
-            )
+        if self._is_admin():
+            return Activation.objects.with_related()
         # Regular users can only see their own activations
         return Activation.objects.filter(
-            license__license_key__customer_email=self.request.user.email
-        ).select_related("license__product__brand", "license__license_key")
+            license__license_key__customer_email=self._user_email()
+        ).with_related()
 
     @action(detail=True, methods=["post"])
     def deactivate(self, request, pk=None):
@@ -363,9 +656,10 @@ class ActivationViewSet(viewsets.ModelViewSet):
             activation.deactivate(reason=serializer.validated_data.get("reason"))
 
             logger.info(
-                f"Activation {activation.id} deactivated by user "
-                f"{request.user.username} for instance "
-                f"{activation.instance_identifier}"
+                "Activation %s deactivated by user %s for instance %s",
+                activation.id,
+                request.user.username,
+                activation.instance_identifier,
             )
 
             result_serializer = self.get_serializer(activation)
@@ -394,33 +688,31 @@ class ActivationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        deactivated_count = 0
-        errors = []
+        activations = Activation.objects.filter(
+            id__in=activation_ids,
+            license__license_key__customer_email=self._user_email(),
+        )
+        found = {
+            str(activation_id): is_active
+            for activation_id, is_active in activations.values_list("id", "is_active")
+        }
 
+        errors = []
         for activation_id in activation_ids:
-            try:
-                activation = Activation.objects.get(
-                    id=activation_id,
-                    license__license_key__customer_email=request.user.email,
-                )
-
-                if activation.is_active:
-                    activation.deactivate(reason=reason)
-                    deactivated_count += 1
+            is_active = found.get(str(activation_id))
+            if is_active is None:
+                errors.append(f"Activation {activation_id} not found or access denied")
+            elif not is_active:
+                errors.append(f"Activation {activation_id} is already deactivated")
 
-                    logger.info(
-                        f"Activation {activation.id} bulk deactivated by user "
-                        f"{request.user.username} for instance "
-                    )
-                else:
-                    errors.append(f"Activation {activation_id} is already deactivated")
+        with transaction.atomic():
+            deactivated_count = Activation.bulk_deactivate(activations, reason=reason)
 
-            except Activation.DoesNotExist:
-                errors.append(f"Activation {activation_id} not found or access denied")
-            except Exception as e:
-                errors.append(
-                    f"Error deactivating activation {activation_id}: {str(e)}"
-                )
+        logger.info(
+            "%s activations bulk deactivated by user %s",
+            deactivated_count,
+            request.user.username,
+        )
 
         return Response(
             {
@@ -432,40 +724,60 @@ class ActivationViewSet(viewsets.ModelViewSet):
         )
 
 
-class LicenseServiceViewSet(viewsets.ViewSet):
+class LicenseServiceViewSet(AdminScopeMixin, viewsets.ViewSet):
     """ViewSet for core license service operations."""
 
     permission_classes = [
         permissions.AllowAny
     ]  # Allow anonymous access for license checks
 
+    @extend_schema(request=LicenseStatusSerializer, tags=["service"])
     @action(detail=False, methods=["post"])
     def check_status(self, request):
         """Check license status and entitlements (US4)."""
-        serializer = LicenseStatusSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        data = validate_service_request(request.data, STATUS_REQUEST_RULES)
 
-        license_key = serializer.validated_data["license_key"]
-        product_slug = serializer.validated_data.get("product_slug")
-        instance_identifier = serializer.validated_data.get("instance_identifier")
+        license_key = data["license_key"]
+        product_slug = data.get("product_slug")
+        instance_identifier = data.get("instance_identifier")
+
+        cache_key = status_cache_key(license_key, product_slug, instance_identifier)
+        response_data = get_cached_status(cache_key)
+        if response_data is not None:
+            return Response(response_data)
 
         try:
-            license_key_obj = LicenseKey.objects.get(key=license_key, is_active=True)
+            license_key_obj = LicenseKey.objects.select_related("brand").get(
+                key=license_key, is_active=True
+            )
         except ObjectDoesNotExist:
             return Response(
                 {"valid": False, "error": "Invalid or inactive license key"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        version = get_status_version(license_key_obj.id)
 
-        # Get all valid licenses for this key
-        licenses = license_key_obj.licenses.filter(
-            status="valid", expiration_date__gt=timezone.now()
-        ).select_related("product")
+        # Get all valid licenses for this key with their used seats in one query
+        now = timezone.now()
+        licenses = License.objects.filter(
+            license_key=license_key_obj, status="valid", expiration_date__gt=now
+        ).with_used_seats()
 
         if product_slug:
-            licenses = licenses.filter(product__slug=product_slug)
-
-        if not licenses.exists():
+            licenses = licenses.filter(product_id__in=product_ids_by_slug(product_slug))
+
+        licenses = list(
+            licenses.values(
+                "id",
+                "product__name",
+                "product__slug",
+                "status",
+                "seats",
+                "expiration_date",
+                "_used_seats",
+            )
+        )
+        if not licenses:
             return Response(
                 {"valid": False, "error": "No valid licenses found for this key"},
                 status=status.HTTP_404_NOT_FOUND,
@@ -474,18 +786,15 @@ class LicenseServiceViewSet(viewsets.ViewSet):
         # Check instance-specific activation if provided
         instance_info = None
         if instance_identifier:
-            activation = Activation.objects.filter(
-                license__in=licenses,
-                instance_identifier=instance_identifier,
-                is_active=True,
-            ).first()
-
-            if activation:
-                instance_info = {
-                    "instance_identifier": activation.instance_identifier,
-                    "instance_type": activation.instance_type,
-                    "activated_at": activation.activated_at,
-                }
+            instance_info = (
+                Activation.objects.filter(
+                    license_id__in=[license["id"] for license in licenses],
+                    instance_identifier=instance_identifier,
+                    is_active=True,
+                )
+                .values("instance_identifier", "instance_type", "activated_at")
+                .first()
+            )
 
         # Build response
         response_data = {
@@ -496,15 +805,15 @@ class LicenseServiceViewSet(viewsets.ViewSet):
             "licenses": [],
         }
 
-        for license_obj in licenses:
+        for license in licenses:
             license_data = {
-                "product": license_obj.product.name,
-                "product_slug": license_obj.product.slug,
-                "status": license_obj.status,
-                "seats": license_obj.seats,
-                "available_seats": license_obj.available_seats,
-                "expiration_date": license_obj.expiration_date,
-                "is_expired": license_obj.is_expired,
+                "product": license["product__name"],
+                "product_slug": license["product__slug"],
+                "status": license["status"],
+                "seats": license["seats"],
+                "available_seats": max(0, license["seats"] - license["_used_seats"]),
+                "expiration_date": license["expiration_date"],
+                "is_expired": now > license["expiration_date"],
             }
 
             if instance_identifier:
@@ -512,71 +821,82 @@ class LicenseServiceViewSet(viewsets.ViewSet):
 
             response_data["licenses"].append(license_data)
 
+        set_cached_status(cache_key, license_key_obj.id, version, response_data)
         return Response(response_data)
 
+    @extend_schema(request=LicenseActivationSerializer, tags=["service"])
     @action(detail=False, methods=["post"])
     def activate(self, request):
         """Activate a license for a specific instance (US3)."""
-        serializer = LicenseActivationSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        license_key = serializer.validated_data["license_key"]
-        product_slug = serializer.validated_data["product_slug"]
-        instance_identifier = serializer.validated_data["instance_identifier"]
-        instance_type = serializer.validated_data["instance_type"]
-
-        try:
-            license_key_obj = LicenseKey.objects.get(key=license_key, is_active=True)
-        except ObjectDoesNotExist:
-            return Response(
-                {"success": False, "error": "Invalid or inactive license key"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        try:
-            license_obj = license_key_obj.licenses.get(
-                product__slug=product_slug,
-                status="valid",
-                expiration_date__gt=timezone.now(),
-            )
-        except ObjectDoesNotExist:
-            return Response(
-                {"success": False, "error": "No valid license found for this product"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        data = validate_service_request(request.data, ACTIVATION_REQUEST_RULES)
 
-        # Check if activation already exists
-        existing_activation = Activation.objects.filter(
-            license=license_obj, instance_identifier=instance_identifier, is_active=True
-        ).first()
+        license_key = data["license_key"]
+        product_slug = data["product_slug"]
+        instance_identifier = data["instance_identifier"]
+        instance_type = data["instance_type"]
 
-        if existing_activation:
-            return Response(
-                {
-                    "success": True,
-                    "message": "License already activated for this instance",
-                    "activation_id": existing_activation.id,
-                }
-            )
+        with transaction.atomic():
+            # Lock the license row so concurrent activations cannot overrun seats
+            try:
+                license_obj = (
+                    License.objects.select_for_update(of=("self",))
+                    .with_used_seats()
+                    .get(
+                        license_key__key=license_key,
+                        license_key__is_active=True,
+                        product_id__in=product_ids_by_slug(product_slug),
+                        status="valid",
+                        expiration_date__gt=timezone.now(),
+                    )
+                )
+            except ObjectDoesNotExist:
+                # Only look the key up separately to pick the error message
+                if not LicenseKey.objects.filter(
+                    key=license_key, is_active=True
+                ).exists():
+                    return Response(
+                        {"success": False, "error": "Invalid or inactive license key"},
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
+                return Response(
+                    {
+                        "success": False,
+                        "error": "No valid license found for this product",
+                    },
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        # Check seat availability
-        if license_obj.available_seats <= 0:
-            return Response(
-                {"success": False, "error": "No available seats for this license"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            # Check seat availability, unless this instance is already activated
+            if license_obj.available_seats <= 0:
+                existing_activation = Activation.objects.filter(
+                    license=license_obj,
+                    instance_identifier=instance_identifier,
+                    is_active=True,
+                ).first()
+                if existing_activation is None:
+                    return Response(
+                        {
+                            "success": False,
+                            "error": "No available seats for this license",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                return self._already_activated_response(existing_activation)
 
-        # Create activation
-        with transaction.atomic():
-            activation = Activation.objects.create(
+            activation, created = Activation.objects.get_or_create(
                 license=license_obj,
                 instance_identifier=instance_identifier,
-                instance_type=instance_type,
+                is_active=True,
+                defaults={"instance_type": instance_type},
             )
+            if not created:
+                return self._already_activated_response(activation)
 
             logger.info(
-                f"License {license_obj.id} activated for instance "
-                f"{instance_identifier} by license key {license_key}"
+                "License %s activated for instance %s by license key %s",
+                license_obj.id,
+                instance_identifier,
+                license_key,
             )
 
         return Response(
@@ -588,14 +908,21 @@ class LicenseServiceViewSet(viewsets.ViewSet):
             }
         )
 
+    def _already_activated_response(self, activation):
+        """Build the response for an instance that is already activated."""
+        return Response(
+            {
+                "success": True,
+                "message": "License already activated for this instance",
+                "activation_id": activation.id,
+            }
+        )
+
     @action(detail=False, methods=["post"])
     def provision(self, request):
         """Provision a new license (US1 - Brand API)."""
         # This endpoint is for brand systems to create licenses
-        if not (
-            request.user.is_authenticated
-            and (request.user.is_license_admin or request.user.is_staff)
-        ):
+        if not self._is_admin():
             raise PermissionDenied("Only license admins can provision licenses.")
 
         customer_email = request.data.get("customer_email")
@@ -609,12 +936,15 @@ class LicenseServiceViewSet(viewsets.ViewSet):
                 "Missing required fields: customer_email, brand_id, "
                 "product_id, expiration_date"
             )
+        customer_email = str(customer_email).lower()
 
         try:
-            brand = Brand.objects.get(id=brand_id, is_active=True)
-            product = Product.objects.get(id=product_id, brand=brand, is_active=True)
+            product = Product.objects.select_related("brand").get(
+                id=product_id, brand_id=brand_id, is_active=True, brand__is_active=True
+            )
         except ObjectDoesNotExist:
             raise ValidationError("Invalid brand or product")
+        brand = product.brand
 
         with transaction.atomic():
             # Create or get existing license key for this customer and brand
@@ -632,8 +962,11 @@ class LicenseServiceViewSet(viewsets.ViewSet):
             )
 
             logger.info(
-                f"License provisioned: {license_obj.id} for {customer_email} "
-                f"on product {product.name} by user {request.user.username}"
+                "License provisioned: %s for %s on product %s by user %s",
+                license_obj.id,
+                customer_email,
+                product.name,
+                request.user.username,
             )
 
         return Response(
@@ -645,3 +978,66 @@ class LicenseServiceViewSet(viewsets.ViewSet):
             },
             status=status.HTTP_201_CREATED,
         )
+
+    @extend_schema(request=BulkLicenseProvisionSerializer, tags=["service"])
+    @action(detail=False, methods=["post"])
+    def provision_bulk(self, request):
+        """Provision many licenses in one transaction (US1 - Brand API)."""
+        if not self._is_admin():
+            raise PermissionDenied("Only license admins can provision licenses.")
+
+        serializer = BulkLicenseProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["licenses"]
+
+        products = Product.objects.filter(
+            is_active=True, brand__is_active=True
+        ).in_bulk({item["product_id"] for item in items})
+        for index, item in enumerate(items):
+            product = products.get(item["product_id"])
+            if product is None or product.brand_id != item["brand_id"]:
+                raise ValidationError(
+                    f"License {index} has an invalid brand or product"
+                )
+
+        with transaction.atomic():
+            license_keys = _get_or_create_license_keys(
+                {(item["customer_email"], item["brand_id"]) for item in items}
+            )
+            licenses = License.objects.bulk_create(
+                License(
+                    license_key=license_keys[
+                        (item["customer_email"], item["brand_id"])
+                    ],
+                    product=products[item["product_id"]],
+                    seats=item["seats"],
+                    expiration_date=item["expiration_date"],
+                    status="valid",
+                )
+                for item in items
+            )
+
+        # bulk_create skips post_save, so drop the cached counts it would clear
+        for product_id in {license.product_id for license in licenses}:
+            invalidate_cached_count("product", product_id, "licenses")
+        for license_key_id in {license.license_key_id for license in licenses}:
+            invalidate_cached_count("licensekey", license_key_id, "licenses")
+            invalidate_cached_status(license_key_id)
+
+        logger.info(
+            "%s licenses bulk provisioned by user %s",
+            len(licenses),
+            request.user.username,
+        )
+
+        return Response(
+            {
+                "success": True,
+                "licenses": [
+                    {"license_key": license.license_key.key, "license_id": license.id}
+                    for license in licenses
+                ],
+                "message": f"Provisioned {len(licenses)} licenses successfully",
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -1,14 +1,27 @@
 """
 Pytest configuration and fixtures for Centralized License Service
 """
+import re
+import uuid
+from collections import Counter
+from collections.abc import Mapping
 from datetime import timedelta
+from http.cookies import SimpleCookie
 
+from django.conf import settings
+from django.contrib.admin import ModelAdmin
+from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 
 import pytest
-from rest_framework.test import APIClient
+import yaml
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 
 # JWT tokens not needed for basic testing
 from licenses.models import Activation, Brand, License, LicenseKey, Product
@@ -16,16 +29,121 @@ from licenses.models import Activation, Brand, License, LicenseKey, Product
 User = get_user_model()
 
 
+def pytest_configure(config):
+    """Keep the test database between runs unless --create-db is passed.
+
+    Under ``pytest -n`` pytest-django already suffixes the test database name
+    with the xdist worker id, so each worker keeps its own reusable database.
+    """
+    if not config.getoption("create_db", default=False):
+        config.option.reuse_db = True
+    # PBKDF2 dominates user fixture setup; tests never need a strong hash.
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+# Precomputed values for the large_dataset fixture.
+PERF_EMAILS = tuple(f"perfcustomer{i}@test.com" for i in range(10))
+PERF_URLS = tuple(f"https://perftest{j}.example.com" for j in range(5))
+PERF_BRAND_SLUGS = tuple(f"perf-brand-{i}" for i in range(25))
+
+# Identical SELECTs (modulo literals) allowed per test before flagging an N+1.
+NPLUS1_THRESHOLD = 5
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SQL_IN_LISTS = re.compile(r"IN \((?:\?, )*\?\)")
+
+
+def _normalize_sql(sql):
+    """Strip literals so queries differing only in parameters compare equal."""
+    return _SQL_IN_LISTS.sub("IN (...)", _SQL_LITERALS.sub("?", sql))
+
+
+@pytest.fixture(autouse=True)
+def detect_nplus1(request):
+    """Fail ``nplus1``-marked tests that repeat the same SELECT too often."""
+    if (
+        request.node.get_closest_marker("nplus1") is None
+        or request.node.get_closest_marker("django_db") is None
+    ):
+        yield
+        return
+    with CaptureQueriesContext(connection) as context:
+        yield
+    repeated = Counter(
+        _normalize_sql(query["sql"])
+        for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+    )
+    offenders = {sql: n for sql, n in repeated.items() if n > NPLUS1_THRESHOLD}
+    if offenders:
+        pytest.fail(
+            "Possible N+1 queries:\n"
+            + "\n".join(f"{n}x {sql}" for sql, n in offenders.items())
+        )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def skip_admin_log_entries():
+    """Skip the admin LogEntry INSERT on every add, change and delete."""
+    with pytest.MonkeyPatch.context() as mp:
+        for name in ("log_addition", "log_change", "log_deletion", "log_deletions"):
+            mp.setattr(ModelAdmin, name, lambda *args, **kwargs: None)
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cached counts and slugs so they never leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(scope="session")
+def _session_client():
+    return Client()
+
+
 @pytest.fixture
 def api_client():
     """API client for testing REST endpoints."""
     return APIClient()
 
 
+def _render_docs_page(client, name):
+    return client.get(reverse(name)).content.decode("utf-8")
+
+
+@pytest.fixture(scope="session")
+def schema_content(_session_client):
+    """Render the OpenAPI schema once for tests that only inspect its text."""
+    return _render_docs_page(_session_client, "schema")
+
+
+@pytest.fixture(scope="session")
+def schema_doc(schema_content):
+    """Parse the rendered OpenAPI schema once for structural assertions."""
+    return yaml.load(
+        schema_content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    )
+
+
+@pytest.fixture(scope="session")
+def swagger_html(_session_client):
+    """Render the Swagger UI page once for tests that only inspect its text."""
+    return _render_docs_page(_session_client, "swagger-ui")
+
+
+@pytest.fixture(scope="session")
+def redoc_html(_session_client):
+    """Render the ReDoc page once for tests that only inspect its text."""
+    return _render_docs_page(_session_client, "redoc")
+
+
 @pytest.fixture
-def client():
-    """Django test client for testing views."""
-    return Client()
+def client(_session_client):
+    """Django test client for testing views, reset before each test."""
+    _session_client.cookies = SimpleCookie()
+    return _session_client
 
 
 @pytest.fixture
@@ -57,6 +175,27 @@ def authenticated_client(admin_user, client):
     return client
 
 
+@pytest.fixture
+def admin_view(admin_user, rf):
+    """Return a callable rendering a ModelAdmin changelist or change view.
+
+    The view is called directly with a RequestFactory request, skipping URL
+    resolution and the middleware stack for read-only admin tests.
+    """
+
+    def _render(model, obj=None, **params):
+        request = rf.get("/admin/", params)
+        request.user = admin_user
+        model_admin = site._registry[model]
+        if obj is None:
+            response = model_admin.changelist_view(request)
+        else:
+            response = model_admin.change_view(request, str(obj.pk))
+        return response.render()
+
+    return _render
+
+
 @pytest.fixture
 def authenticated_api_client(admin_user, api_client):
     """Return an authenticated API client."""
@@ -64,6 +203,30 @@ def authenticated_api_client(admin_user, api_client):
     return api_client
 
 
+@pytest.fixture
+def api_view():
+    """Return a callable dispatching a request straight to a viewset action.
+
+    The view is called directly with an APIRequestFactory request, skipping
+    URL resolution and the middleware stack for permission and 404 tests.
+    """
+    factory = APIRequestFactory()
+
+    def _dispatch(viewset, action, method="get", user=None, **kwargs):
+        request = getattr(factory, method)("/api/")
+        if user is not None:
+            force_authenticate(request, user=user)
+        return viewset.as_view({method: action})(request, **kwargs)
+
+    return _dispatch
+
+
+@pytest.fixture(scope="session")
+def time_anchor():
+    """Snapshot ``now`` once so fixture dates share a single reference point."""
+    return timezone.now()
+
+
 @pytest.fixture
 def brand():
     """Create and return a test brand."""
@@ -87,19 +250,30 @@ def product(brand):
 def license_key(brand):
     """Create and return a test license key."""
     return LicenseKey.objects.create(
-        key="TEST-LICENSE-KEY-12345", brand=brand, customer_email="test@example.com"
+        key=uuid.UUID("12345678-90ab-4cde-8f01-234567890abc"),
+        brand=brand,
+        customer_email="test@example.com",
     )
 
 
 @pytest.fixture
-def license(license_key, product):
+def license_factory(license_key, product, time_anchor):
+    """Return a callable that creates licenses for the shared key and product."""
+
+    def _make(**overrides):
+        overrides.setdefault("license_key", license_key)
+        overrides.setdefault("product", product)
+        overrides.setdefault("seats", 5)
+        overrides.setdefault("expiration_date", time_anchor + timedelta(days=365))
+        return License.objects.create(**overrides)
+
+    return _make
+
+
+@pytest.fixture
+def license(license_factory):
     """Create and return a test license."""
-    return License.objects.create(
-        license_key=license_key,
-        product=product,
-        seats=5,
-        expiration_date=timezone.now() + timedelta(days=365),
-    )
+    return license_factory()
 
 
 @pytest.fixture
@@ -112,68 +286,103 @@ def activation(license):
     )
 
 
+@pytest.fixture
+def deactivated_activation(license, time_anchor):
+    """Create and return a deactivated test activation.
+
+    The terminal state is written directly; tests of the transition itself
+    should call ``Activation.deactivate``.
+    """
+    return Activation.objects.create(
+        license=license,
+        instance_identifier="https://test.example.com",
+        instance_type="website",
+        is_active=False,
+        deactivated_at=time_anchor,
+        deactivation_reason="Testing",
+    )
+
+
 @pytest.fixture
 def multiple_activations(license):
     """Create and return multiple test activations."""
-    activations = []
-    for i in range(3):
-        activation = Activation.objects.create(
+    return Activation.objects.bulk_create(
+        Activation(
             license=license,
             instance_identifier=f"https://test{i}.example.com",
             instance_type="website",
         )
-        activations.append(activation)
-    return activations
+        for i in range(3)
+    )
 
 
 @pytest.fixture
-def expired_license(license_key, product):
+def expired_license(license_factory, time_anchor):
     """Create and return an expired test license."""
-    return License.objects.create(
-        license_key=license_key,
-        product=product,
-        seats=3,
-        expiration_date=timezone.now() - timedelta(days=1),
-    )
+    return license_factory(seats=3, expiration_date=time_anchor - timedelta(days=1))
 
 
 @pytest.fixture
-def suspended_license(license_key, product):
-    """Create and return a suspended test license."""
-    license = License.objects.create(
-        license_key=license_key,
-        product=product,
+def suspended_license(license_factory, time_anchor):
+    """Create and return a suspended test license.
+
+    The terminal state is written directly; tests of the transition itself
+    should call ``License.suspend``.
+    """
+    return license_factory(
         seats=2,
-        expiration_date=timezone.now() + timedelta(days=30),
+        expiration_date=time_anchor + timedelta(days=30),
+        status="suspended",
+        suspension_reason="Testing suspension",
+        suspended_at=time_anchor,
     )
-    license.suspend("Testing suspension")
-    return license
 
 
 @pytest.fixture
-def cancelled_license(license_key, product):
-    """Create and return a cancelled test license."""
-    license = License.objects.create(
-        license_key=license_key,
-        product=product,
+def cancelled_license(license_factory, time_anchor):
+    """Create and return a cancelled test license.
+
+    The terminal state is written directly; tests of the transition itself
+    should call ``License.cancel``.
+    """
+    return license_factory(
         seats=2,
-        expiration_date=timezone.now() + timedelta(days=30),
+        expiration_date=time_anchor + timedelta(days=30),
+        status="cancelled",
+        cancellation_reason="Testing cancellation",
+        cancelled_at=time_anchor,
     )
-    license.cancel("Testing cancellation")
-    return license
 
 
-@pytest.fixture
-def sample_data(brand, product, license_key, license, multiple_activations):
-    """Create and return a complete set of sample data."""
-    return {
-        "brand": brand,
-        "product": product,
-        "license_key": license_key,
-        "license": license,
-        "activations": multiple_activations,
+class LazySampleData(Mapping):
+    """Mapping that only builds the fixture behind a key when it is read."""
+
+    fixtures = {
+        "brand": "brand",
+        "product": "product",
+        "license_key": "license_key",
+        "license": "license",
+        "activations": "multiple_activations",
     }
 
+    def __init__(self, request):
+        self._request = request
+
+    def __getitem__(self, key):
+        return self._request.getfixturevalue(self.fixtures[key])
+
+    def __iter__(self):
+        return iter(self.fixtures)
+
+    def __len__(self):
+        return len(self.fixtures)
+
+
+@pytest.fixture
+def sample_data(request):
+    """Return the sample data set; each entry is created on first access."""
+    return LazySampleData(request)
+
 
 @pytest.fixture
 def api_headers():
@@ -252,41 +461,51 @@ def db_transaction_class():
 
 # Performance testing fixtures
 @pytest.fixture
-def large_dataset(brand, product):
+def large_dataset(brand, product, time_anchor):
     """Create a large dataset for performance testing."""
     # Create multiple license keys
-    license_keys = []
-    for i in range(10):
-        license_key = LicenseKey.objects.create(
-            key=f"PERF-LICENSE-KEY-{i:04d}",
+    license_keys = LicenseKey.objects.bulk_create(
+        LicenseKey(
+            key=uuid.UUID(int=i + 1),
             brand=brand,
-            customer_email=f"perfcustomer{i}@test.com",
+            customer_email=email,
         )
-        license_keys.append(license_key)
+        for i, email in enumerate(PERF_EMAILS)
+    )
 
     # Create multiple licenses
-    licenses = []
-    for i, license_key in enumerate(license_keys):
-        license = License.objects.create(
+    licenses = License.objects.bulk_create(
+        License(
             license_key=license_key,
             product=product,
             seats=8,
-            expiration_date=timezone.now() + timedelta(days=365),
+            expiration_date=time_anchor + timedelta(days=365),
         )
-        licenses.append(license)
+        for license_key in license_keys
+    )
 
     # Create multiple activations
-    activations = []
-    for license in licenses:
-        for j in range(5):
-            activation = Activation.objects.create(
+    activations = Activation.objects.bulk_create(
+        (
+            Activation(
                 license=license,
-                instance_identifier=f"https://perftest{j}.example.com",
+                instance_identifier=url,
                 instance_type="website",
             )
-            activations.append(activation)
+            for license in licenses
+            for url in PERF_URLS
+        ),
+        batch_size=500,
+    )
+
+    # Extra brands so the brand list spans more than one page
+    brands = Brand.objects.bulk_create(
+        Brand(name=slug.replace("-", " ").title(), slug=slug)
+        for slug in PERF_BRAND_SLUGS
+    )
 
     return {
+        "brands": brands,
         "license_keys": license_keys,
         "licenses": licenses,
         "activations": activations,
@@ -1,35 +1,50 @@
+import csv
+import io
+from functools import cache
+from operator import attrgetter
+from typing import Callable, NamedTuple
+
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 import pytest
 
+from licenses.admin_paginators import ApproxCountPaginator
 from licenses.models import Activation, Brand, License, LicenseKey, Product
 
 User = get_user_model()
 
 
+@cache
+def admin_url(name, *args):
+    """Reverse an admin URL once per distinct name and arguments."""
+    return reverse(name, args=args)
+
+
 @pytest.mark.django_db
 class TestAdminAuthentication:
     """Test admin authentication and access control."""
 
     def test_admin_login_page(self, client):
         """Test that admin login page is accessible."""
-        url = reverse("admin:login")
+        url = admin_url("admin:login")
         response = client.get(url)
         assert response.status_code == 200
-        assert "Django administration" in response.content.decode("utf-8")
+        assert b"Django administration" in response.content
 
-    def test_admin_login_success(self, admin_user, client):
+    def test_admin_login_success(self, authenticated_client):
         """Test successful admin login."""
-        client.force_login(admin_user)
-        url = reverse("admin:index")
-        response = client.get(url)
+        url = admin_url("admin:index")
+        response = authenticated_client.get(url)
         assert response.status_code == 200
-        assert "Django administration" in response.content.decode("utf-8")
+        assert b"Django administration" in response.content
 
     def test_admin_login_failure(self, client):
         """Test failed admin login."""
-        url = reverse("admin:login")
+        url = admin_url("admin:login")
         data = {
             "username": "wronguser",
             "password": "wrongpass",
@@ -37,515 +52,491 @@ class TestAdminAuthentication:
         response = client.post(url, data, follow=True)
         assert response.status_code == 200
         # Should still be on login page
-        assert "Django administration" in response.content.decode("utf-8")
+        assert b"Django administration" in response.content
 
 
 @pytest.mark.django_db
 class TestAdminInterface:
     """Test admin interface accessibility and functionality."""
 
-    def test_admin_index(self, admin_user, client):
+    def test_admin_index(self, authenticated_client):
         """Test admin index page."""
-        client.force_login(admin_user)
-        url = reverse("admin:index")
-        response = client.get(url)
+        url = admin_url("admin:index")
+        response = authenticated_client.get(url)
         assert response.status_code == 200
-        assert "Django administration" in response.content.decode("utf-8")
+        assert b"Django administration" in response.content
 
-    def test_admin_app_list(self, admin_user, client):
+    def test_admin_app_list(self, authenticated_client):
         """Test admin app list."""
-        client.force_login(admin_user)
-        url = reverse("admin:app_list", args=["licenses"])
-        response = client.get(url)
-        assert response.status_code == 200
-
-
-@pytest.mark.django_db
-class TestBrandAdmin:
-    """Test Brand admin functionality."""
-
-    def test_brand_list_view(self, admin_user, client, brand):
-        """Test brand list view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-        assert brand.name in response.content.decode("utf-8")
-
-    def test_brand_add_view(self, admin_user, client):
-        """Test brand add view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_add")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_brand_creation(self, admin_user, client):
-        """Test brand creation through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_add")
-        data = {
-            "name": "New Brand",
-            "slug": "new-brand",
-            "description": "A new test brand",
-        }
-        response = client.post(url, data, follow=True)
+        url = admin_url("admin:app_list", "licenses")
+        response = authenticated_client.get(url)
         assert response.status_code == 200
-        assert Brand.objects.filter(name="New Brand").exists()
 
-    def test_brand_change_view(self, admin_user, client, brand):
-        """Test brand change view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_change", args=[brand.id])
-        response = client.get(url)
-        assert response.status_code == 200
-        assert brand.name in response.content.decode("utf-8")
 
-    def test_brand_update(self, admin_user, client, brand):
-        """Test brand update through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_change", args=[brand.id])
-        data = {
-            "name": "Updated Brand",
-            "slug": "updated-brand",
-            "description": "Updated description",
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        brand.refresh_from_db()
-        assert brand.name == "Updated Brand"
+def _brand_create(get):
+    data = {"name": "New Brand", "slug": "new-brand", "description": "A new test brand"}
+    return data, {"name": "New Brand"}
 
-    def test_brand_delete_view(self, admin_user, client, brand):
-        """Test brand delete view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_delete", args=[brand.id])
-        response = client.get(url)
-        assert response.status_code == 200
 
-    def test_brand_deletion(self, admin_user, client, brand):
-        """Test brand deletion through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_delete", args=[brand.id])
-        data = {"post": "yes"}
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert not Brand.objects.filter(id=brand.id).exists()
+def _brand_update(brand):
+    data = {
+        "name": "Updated Brand",
+        "slug": "updated-brand",
+        "description": "Updated description",
+    }
+    return data, "name", "Updated Brand"
+
+
+def _product_create(get):
+    data = {
+        "name": "New Product",
+        "slug": "new-product",
+        "description": "A new test product",
+        "brand": get("brand").id,
+    }
+    return data, {"name": "New Product"}
+
+
+def _product_update(product):
+    data = {
+        "name": "Updated Product",
+        "slug": "updated-product",
+        "description": "Updated description",
+        "brand": product.brand.id,
+    }
+    return data, "name", "Updated Product"
+
+
+def _license_key_create(get):
+    data = {"customer_email": "new@test.com", "brand": get("brand").id}
+    return data, {"customer_email": "new@test.com"}
+
+
+def _license_key_update(license_key):
+    data = {"customer_email": "updated@test.com", "brand": license_key.brand.id}
+    return data, "customer_email", "updated@test.com"
+
+
+def _license_create(get):
+    data = {
+        "license_key": get("license_key").id,
+        "product": get("product").id,
+        "status": "valid",
+        "seats": 10,
+        "expiration_date_0": "2026-12-31",
+        "expiration_date_1": "00:00:00",
+    }
+    return data, {"seats": 10}
+
+
+def _license_update(license):
+    data = {
+        "license_key": license.license_key.id,
+        "product": license.product.id,
+        "status": "valid",
+        "seats": 15,
+        "expiration_date_0": "2026-12-31",
+        "expiration_date_1": "00:00:00",
+    }
+    return data, "seats", 15
+
+
+def _activation_create(get):
+    data = {
+        "license": get("license").id,
+        "instance_identifier": "test-instance-123",
+        "instance_url": "https://test.example.com",
+    }
+    return data, {"instance_identifier": "test-instance-123"}
+
+
+def _activation_update(activation):
+    data = {
+        "license": activation.license.id,
+        "instance_identifier": "updated-instance-456",
+        "instance_url": "https://updated.example.com",
+    }
+    return data, "instance_identifier", "updated-instance-456"
+
+
+class CrudCase(NamedTuple):
+    """How to exercise one model's admin add, change and delete views."""
+
+    fixture: str
+    model: type
+    display: Callable
+    create: Callable
+    update: Callable
+
+    @property
+    def url_prefix(self):
+        return f"admin:licenses_{self.model._meta.model_name}"
+
+
+CRUD_CASES = [
+    pytest.param(
+        CrudCase("brand", Brand, attrgetter("name"), _brand_create, _brand_update),
+        id="brand",
+    ),
+    pytest.param(
+        CrudCase(
+            "product", Product, attrgetter("name"), _product_create, _product_update
+        ),
+        id="product",
+    ),
+    pytest.param(
+        CrudCase(
+            "license_key",
+            LicenseKey,
+            attrgetter("customer_email"),
+            _license_key_create,
+            _license_key_update,
+        ),
+        id="license_key",
+    ),
+    pytest.param(
+        CrudCase(
+            "license",
+            License,
+            lambda license: str(license.product),
+            _license_create,
+            _license_update,
+        ),
+        id="license",
+    ),
+    pytest.param(
+        CrudCase(
+            "activation",
+            Activation,
+            attrgetter("instance_identifier"),
+            _activation_create,
+            _activation_update,
+        ),
+        id="activation",
+    ),
+]
 
 
 @pytest.mark.django_db
-class TestProductAdmin:
-    """Test Product admin functionality."""
-
-    def test_product_list_view(self, admin_user, client, product):
-        """Test product list view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-        assert product.name in response.content.decode("utf-8")
-
-    def test_product_add_view(self, admin_user, client, brand):
-        """Test product add view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_add")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_product_creation(self, admin_user, client, brand):
-        """Test product creation through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_add")
-        data = {
-            "name": "New Product",
-            "slug": "new-product",
-            "description": "A new test product",
-            "brand": brand.id,
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert Product.objects.filter(name="New Product").exists()
-
-    def test_product_change_view(self, admin_user, client, product):
-        """Test product change view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_change", args=[product.id])
-        response = client.get(url)
-        assert response.status_code == 200
-        assert product.name in response.content.decode("utf-8")
-
-    def test_product_update(self, admin_user, client, product):
-        """Test product update through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_change", args=[product.id])
-        data = {
-            "name": "Updated Product",
-            "slug": "updated-product",
-            "description": "Updated description",
-            "brand": product.brand.id,
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        product.refresh_from_db()
-        assert product.name == "Updated Product"
-
-    def test_product_delete_view(self, admin_user, client, product):
-        """Test product delete view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_delete", args=[product.id])
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_product_deletion(self, admin_user, client, product):
-        """Test product deletion through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_delete", args=[product.id])
-        data = {"post": "yes"}
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert not Product.objects.filter(id=product.id).exists()
-
-
-@pytest.mark.django_db
-class TestLicenseKeyAdmin:
-    """Test LicenseKey admin functionality."""
-
-    def test_license_key_list_view(self, admin_user, client, license_key):
-        """Test license key list view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-        assert license_key.customer_email in response.content.decode("utf-8")
-
-    def test_license_key_add_view(self, admin_user, client, brand):
-        """Test license key add view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_add")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_license_key_creation(self, admin_user, client, brand):
-        """Test license key creation through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_add")
-        data = {
-            "customer_email": "new@test.com",
-            "brand": brand.id,
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert LicenseKey.objects.filter(customer_email="new@test.com").exists()
-
-    def test_license_key_change_view(self, admin_user, client, license_key):
-        """Test license key change view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_change", args=[license_key.id])
-        response = client.get(url)
-        assert response.status_code == 200
-        assert license_key.customer_email in response.content.decode("utf-8")
-
-    def test_license_key_update(self, admin_user, client, license_key):
-        """Test license key update through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_change", args=[license_key.id])
-        data = {
-            "customer_email": "updated@test.com",
-            "brand": license_key.brand.id,
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        license_key.refresh_from_db()
-        assert license_key.customer_email == "updated@test.com"
-
-    def test_license_key_delete_view(self, admin_user, client, license_key):
-        """Test license key delete view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_delete", args=[license_key.id])
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_license_key_deletion(self, admin_user, client, license_key):
-        """Test license key deletion through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_delete", args=[license_key.id])
-        data = {"post": "yes"}
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert not LicenseKey.objects.filter(id=license_key.id).exists()
-
-
-@pytest.mark.django_db
-class TestLicenseAdmin:
-    """Test License admin functionality."""
-
-    def test_license_list_view(self, admin_user, client, license):
-        """Test license list view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-        assert str(license.product) in response.content.decode("utf-8")
-
-    def test_license_add_view(self, admin_user, client, license_key, product):
-        """Test license add view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_add")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_license_creation(self, admin_user, client, license_key, product):
-        """Test license creation through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_add")
-        data = {
-            "license_key": license_key.id,
-            "product": product.id,
-            "status": "valid",
-            "seats": 10,
-            "expiration_date_0": "2026-12-31",
-            "expiration_date_1": "00:00:00",
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert License.objects.filter(seats=10).exists()
-
-    def test_license_change_view(self, admin_user, client, license):
-        """Test license change view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_change", args=[license.id])
-        response = client.get(url)
-        assert response.status_code == 200
-        assert str(license.product) in response.content.decode("utf-8")
-
-    def test_license_update(self, admin_user, client, license):
-        """Test license update through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_change", args=[license.id])
-        data = {
-            "license_key": license.license_key.id,
-            "product": license.product.id,
-            "status": "valid",
-            "seats": 15,
-            "expiration_date_0": "2026-12-31",
-            "expiration_date_1": "00:00:00",
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        license.refresh_from_db()
-        assert license.seats == 15
-
-    def test_license_delete_view(self, admin_user, client, license):
-        """Test license delete view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_delete", args=[license.id])
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_license_deletion(self, admin_user, client, license):
-        """Test license deletion through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_delete", args=[license.id])
-        data = {"post": "yes"}
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert not License.objects.filter(id=license.id).exists()
-
-
-@pytest.mark.django_db
-class TestActivationAdmin:
-    """Test Activation admin functionality."""
-
-    def test_activation_list_view(self, admin_user, client, activation):
-        """Test activation list view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-        assert activation.instance_identifier in response.content.decode("utf-8")
-
-    def test_activation_add_view(self, admin_user, client, license):
-        """Test activation add view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_add")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_activation_creation(self, admin_user, client, license):
-        """Test activation creation through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_add")
-        data = {
-            "license": license.id,
-            "instance_identifier": "test-instance-123",
-            "instance_url": "https://test.example.com",
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert Activation.objects.filter(
-            instance_identifier="test-instance-123"
-        ).exists()
-
-    def test_activation_change_view(self, admin_user, client, activation):
-        """Test activation change view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_change", args=[activation.id])
-        response = client.get(url)
-        assert response.status_code == 200
-        assert activation.instance_identifier in response.content.decode("utf-8")
-
-    def test_activation_update(self, admin_user, client, activation):
-        """Test activation update through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_change", args=[activation.id])
-        data = {
-            "license": activation.license.id,
-            "instance_identifier": "updated-instance-456",
-            "instance_url": "https://updated.example.com",
-        }
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        activation.refresh_from_db()
-        assert activation.instance_identifier == "updated-instance-456"
-
-    def test_activation_delete_view(self, admin_user, client, activation):
-        """Test activation delete view in admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_delete", args=[activation.id])
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_activation_deletion(self, admin_user, client, activation):
-        """Test activation deletion through admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_delete", args=[activation.id])
-        data = {"post": "yes"}
-        response = client.post(url, data, follow=True)
-        assert response.status_code == 200
-        assert not Activation.objects.filter(id=activation.id).exists()
+@pytest.mark.parametrize("case", CRUD_CASES)
+class TestModelAdminCrud:
+    """Test the list, add, change and delete views of each model admin."""
+
+    def test_list_view(self, admin_view, request, case):
+        """Test the changelist shows the existing object."""
+        obj = request.getfixturevalue(case.fixture)
+        response = admin_view(case.model)
+        assert response.status_code == 200
+        assert case.display(obj).encode() in response.content
+
+    def test_add_view(self, authenticated_client, case):
+        """Test the add view renders."""
+        response = authenticated_client.get(admin_url(f"{case.url_prefix}_add"))
+        assert response.status_code == 200
+
+    def test_creation(self, authenticated_client, request, case):
+        """Test creating an object through the add view."""
+        data, lookup = case.create(request.getfixturevalue)
+        url = admin_url(f"{case.url_prefix}_add")
+        response = authenticated_client.post(url, data)
+        assert response.status_code == 302
+        assert response.url == admin_url(f"{case.url_prefix}_changelist")
+        assert case.model.objects.filter(**lookup).exists()
+
+    def test_change_view(self, admin_view, request, case):
+        """Test the change view shows the existing object."""
+        obj = request.getfixturevalue(case.fixture)
+        response = admin_view(case.model, obj)
+        assert response.status_code == 200
+        assert case.display(obj).encode() in response.content
+
+    def test_update(self, authenticated_client, request, case):
+        """Test updating an object through the change view."""
+        obj = request.getfixturevalue(case.fixture)
+        data, field, expected = case.update(obj)
+        url = admin_url(f"{case.url_prefix}_change", obj.id)
+        response = authenticated_client.post(url, data)
+        assert response.status_code == 302
+        assert response.url == admin_url(f"{case.url_prefix}_changelist")
+        obj.refresh_from_db()
+        assert getattr(obj, field) == expected
+
+    def test_deletion(self, authenticated_client, request, case):
+        """Test the delete confirmation page and deleting through it."""
+        obj = request.getfixturevalue(case.fixture)
+        url = admin_url(f"{case.url_prefix}_delete", obj.id)
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        response = authenticated_client.post(url, {"post": "yes"})
+        assert response.status_code == 302
+        assert response.url == admin_url(f"{case.url_prefix}_changelist")
+        assert not case.model.objects.filter(id=obj.id).exists()
 
 
 @pytest.mark.django_db
 class TestAdminCustomizations:
     """Test admin customizations and display methods."""
 
-    def test_brand_admin_display(self, admin_user, client, brand):
+    def test_brand_admin_display(self, admin_view, brand):
         """Test brand admin display methods."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_changelist")
-        response = client.get(url)
-        content = response.content.decode("utf-8")
-        assert brand.name in content
-        assert brand.slug in content
+        response = admin_view(Brand)
+        content = response.content
+        assert brand.name.encode() in content
+        assert brand.slug.encode() in content
 
-    def test_product_admin_display(self, admin_user, client, product):
+    def test_product_admin_display(self, admin_view, product):
         """Test product admin display methods."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_changelist")
-        response = client.get(url)
-        content = response.content.decode("utf-8")
-        assert product.name in content
-        assert product.brand.name in content
+        response = admin_view(Product)
+        content = response.content
+        assert product.name.encode() in content
+        assert product.brand.name.encode() in content
 
-    def test_license_key_admin_display(self, admin_user, client, license_key):
+    def test_license_key_admin_display(self, admin_view, license_key):
         """Test license key admin display methods."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_licensekey_changelist")
-        response = client.get(url)
-        content = response.content.decode("utf-8")
-        assert license_key.customer_email in content
-        assert license_key.brand.name in content
+        response = admin_view(LicenseKey)
+        content = response.content
+        assert license_key.customer_email.encode() in content
+        assert license_key.brand.name.encode() in content
 
-    def test_license_admin_display(self, admin_user, client, license):
+    def test_license_admin_display(self, admin_view, license):
         """Test license admin display methods."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_changelist")
-        response = client.get(url)
-        content = response.content.decode("utf-8")
+        response = admin_view(License)
+        content = response.content
         # Check if the license data is displayed
-        assert str(license.product) in content
+        assert str(license.product).encode() in content
         # The license key might not be displayed in the changelist view
         # Let's check if the license is actually in the database
         assert License.objects.filter(id=license.id).exists()
 
-    def test_activation_admin_display(self, admin_user, client, activation):
+    def test_admin_key_truncation(self, authenticated_client, license):
+        """Test license keys are truncated in the changelists."""
+        response = authenticated_client.get(
+            admin_url("admin:licenses_licensekey_changelist")
+        )
+        assert b"<code>12345678-90ab-4cde-8...</code>" in response.content
+        response = authenticated_client.get(
+            admin_url("admin:licenses_license_changelist")
+        )
+        assert b"<code>12345678-90ab-4...</code>" in response.content
+
+    def test_license_admin_expired_display(self, admin_view, expired_license):
+        """Test license admin flags expired licenses."""
+        response = admin_view(License)
+        content = response.content
+        assert b'<span style="color: red;">Expired</span>' in content
+
+    def test_activation_admin_display(self, admin_view, activation):
         """Test activation admin display methods."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_changelist")
-        response = client.get(url)
-        content = response.content.decode("utf-8")
+        response = admin_view(Activation)
+        content = response.content
         # Check if the activation data is displayed
-        assert activation.instance_identifier in content
+        assert activation.instance_identifier.encode() in content
         # The license might not be displayed in the changelist view
         # Let's check if the activation is actually in the database
         assert Activation.objects.filter(id=activation.id).exists()
 
+    def test_user_changelist_loads_only_listed_columns(self, admin_view, regular_user):
+        """Test the user changelist skips columns it does not display."""
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_view(User)
+
+        assert regular_user.username.encode() in response.content
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        assert '"users"."address"' not in sql
+        assert '"users"."password"' not in sql
+
+    def test_user_change_form_loads_address(self, authenticated_client, regular_user):
+        """Test the user change form fetches the deferred address with the row."""
+        User.objects.filter(pk=regular_user.pk).update(address="1 Main Street")
+        url = admin_url("admin:users_user_change", regular_user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(url)
+
+        assert b"1 Main Street" in response.content
+        user_loads = [
+            q["sql"]
+            for q in queries.captured_queries
+            if 'FROM "users" WHERE' in q["sql"]
+        ]
+        # The session user's lookup, then a single full row for the edited user
+        assert len(user_loads) == 2
+        assert '"users"."address"' in user_loads[1]
+
+    def test_user_changelist_skips_full_result_count(self, admin_view, regular_user):
+        """Test a filtered user changelist counts only the filtered rows."""
+        with CaptureQueriesContext(connection) as queries:
+            admin_view(User, is_active__exact="1")
+
+        counts = [q for q in queries.captured_queries if "COUNT(" in q["sql"]]
+        assert len(counts) == 1
+
+    def test_user_company_filter_choices_cached(self, admin_view, regular_user):
+        """Test the company filter runs its DISTINCT query once per cache TTL."""
+        User.objects.filter(pk=regular_user.pk).update(company_name="Acme")
+        admin_view(User)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_view(User)
+
+        assert b"?company_name=Acme" in response.content
+        # The admin user has no company, which is stored as "" and not listed
+        assert b'?company_name="' not in response.content
+        assert not any("DISTINCT" in q["sql"] for q in queries.captured_queries)
+
+    def test_license_product_filter(self, admin_view, license_factory, product):
+        """Test the license product filter lists licensed products from cache."""
+        license = license_factory()
+        other = Product.objects.create(name="Other", slug="other", brand=product.brand)
+        license_factory(product=other)
+        unlicensed = Product.objects.create(
+            name="Unlicensed", slug="unlicensed", brand=product.brand
+        )
+        response = admin_view(License)
+        assert f'href="?product__id__exact={product.pk}"'.encode() in response.content
+        assert f'href="?product__id__exact={other.pk}"'.encode() in response.content
+        assert f"product__id__exact={unlicensed.pk}".encode() not in response.content
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_view(License, product__id__exact=str(product.pk))
+
+        assert license.license_key.customer_email.encode() in response.content
+        assert not any('FROM "products"' in q["sql"] for q in queries.captured_queries)
+
+    @pytest.mark.parametrize(
+        "model,lookup",
+        [
+            (Product, "brand__id__exact"),
+            (LicenseKey, "brand__id__exact"),
+            (License, "product__brand__id__exact"),
+            (Activation, "license__product__brand__id__exact"),
+        ],
+    )
+    def test_brand_filter_choices_cached(self, admin_view, activation, model, lookup):
+        """Test brand filters list every brand without querying them per render."""
+        brand = activation.license.product.brand
+        other = Brand.objects.create(name="Other Brand", slug="other-brand")
+        admin_view(model)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_view(model)
+
+        for pk in (brand.pk, other.pk):
+            assert f'href="?{lookup}={pk}"'.encode() in response.content
+        assert not any('FROM "brands"' in q["sql"] for q in queries.captured_queries)
+
+    @pytest.mark.parametrize("model", [Brand, Product, LicenseKey, License, Activation])
+    def test_changelist_query_count_is_flat(self, admin_view, activation, model):
+        """Test changelist queries do not grow with the number of rows."""
+        with CaptureQueriesContext(connection) as single:
+            admin_view(model)
+        brand = Brand.objects.create(name="Second Brand", slug="second-brand")
+        for i in range(4):
+            product = Product.objects.create(
+                name=f"Product {i}", slug=f"product-{i}", brand=brand
+            )
+            key = LicenseKey.objects.create(
+                brand=brand, customer_email=f"customer{i}@test.com"
+            )
+            license = License.objects.create(
+                license_key=key,
+                product=product,
+                seats=1,
+                expiration_date=activation.license.expiration_date,
+            )
+            Activation.objects.create(license=license, instance_identifier=f"i{i}")
+        # Render both cold, so cached sidebar choices do not hide a query
+        caches["default"].clear()
+        with CaptureQueriesContext(connection) as many:
+            admin_view(model)
+        assert len(many) == len(single)
+
 
 @pytest.mark.django_db
 class TestAdminActions:
     """Test admin actions and bulk operations."""
 
-    def test_brand_admin_actions(self, admin_user, client, brand):
-        """Test brand admin actions."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_product_admin_actions(self, admin_user, client, product):
-        """Test product admin actions."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_license_admin_actions(self, admin_user, client, license):
-        """Test license admin actions."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
-
-    def test_activation_admin_actions(self, admin_user, client, activation):
-        """Test activation admin actions."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_changelist")
-        response = client.get(url)
-        assert response.status_code == 200
+    @pytest.mark.parametrize(
+        "fixture,model",
+        [
+            ("brand", Brand),
+            ("product", Product),
+            ("license", License),
+            ("activation", Activation),
+        ],
+    )
+    def test_delete_selected_confirmation(
+        self, authenticated_client, request, fixture, model
+    ):
+        """Test the delete_selected action renders its confirmation page."""
+        obj = request.getfixturevalue(fixture)
+        url = admin_url(f"admin:licenses_{model._meta.model_name}_changelist")
+        data = {"action": "delete_selected", "_selected_action": [obj.id]}
+        response = authenticated_client.post(url, data)
+        assert response.status_code == 200
+        assert b"Are you sure?" in response.content
+        assert model.objects.filter(id=obj.id).exists()
+
+    def test_export_users_as_csv(self, authenticated_client, regular_user):
+        """Test the export action streams the selected users as CSV."""
+        url = admin_url("admin:users_user_changelist")
+        data = {"action": "export_as_csv", "_selected_action": [regular_user.id]}
+        response = authenticated_client.post(url, data)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith("username,email,")
+        assert lines[1].startswith("testuser,user@test.com,")
+        assert len(lines) == 2
+
+    def test_export_users_as_csv_escapes_formulas(
+        self, authenticated_client, regular_user
+    ):
+        """Test exported text that a spreadsheet would evaluate is quoted."""
+        User.objects.filter(pk=regular_user.pk).update(
+            first_name='=HYPERLINK("http://evil.test")',
+            last_name="-1+2",
+            company_name="@SUM(A1)",
+        )
+        url = admin_url("admin:users_user_changelist")
+        data = {"action": "export_as_csv", "_selected_action": [regular_user.id]}
+        response = authenticated_client.post(url, data)
+
+        row = next(
+            csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        assert row["first_name"] == '\'=HYPERLINK("http://evil.test")'
+        assert row["last_name"] == "'-1+2"
+        assert row["company_name"] == "'@SUM(A1)"
+        assert row["username"] == "testuser"
 
 
 @pytest.mark.django_db
 class TestAdminSearchAndFiltering:
     """Test admin search and filtering functionality."""
 
-    def test_brand_admin_search(self, admin_user, client, brand):
+    def test_brand_admin_search(self, admin_view, brand):
         """Test brand admin search."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_brand_changelist")
-        response = client.get(url, {"q": brand.name})
+        response = admin_view(Brand, q=brand.name)
         assert response.status_code == 200
-        assert brand.name in response.content.decode("utf-8")
+        assert brand.name.encode() in response.content
 
-    def test_product_admin_search(self, admin_user, client, product):
+    def test_product_admin_search(self, admin_view, product):
         """Test product admin search."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_product_changelist")
-        response = client.get(url, {"q": product.name})
+        response = admin_view(Product, q=product.name)
         assert response.status_code == 200
-        assert product.name in response.content.decode("utf-8")
+        assert product.name.encode() in response.content
 
-    def test_license_admin_search(self, admin_user, client, license):
+    def test_license_admin_search(self, admin_view, license):
         """Test license admin search."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_license_changelist")
-        response = client.get(url, {"q": str(license.product)})
+        response = admin_view(License, q=str(license.product))
         assert response.status_code == 200
 
-    def test_activation_admin_search(self, admin_user, client, activation):
+    def test_activation_admin_search(self, admin_view, activation):
         """Test activation admin search."""
-        client.force_login(admin_user)
-        url = reverse("admin:licenses_activation_changelist")
-        response = client.get(url, {"q": activation.instance_identifier})
+        response = admin_view(Activation, q=activation.instance_identifier)
         assert response.status_code == 200
-        assert activation.instance_identifier in response.content.decode("utf-8")
+        assert activation.instance_identifier.encode() in response.content
 
 
 @pytest.mark.django_db
@@ -555,16 +546,33 @@ class TestAdminPermissions:
     def test_regular_user_admin_access(self, regular_user, client):
         """Test that regular users cannot access admin."""
         client.force_login(regular_user)
-        url = reverse("admin:index")
+        url = admin_url("admin:index")
         response = client.get(url)
         # Regular users get redirected to login page (302) or forbidden (403)
         # depending on Django version and configuration
         assert response.status_code in [302, 403]
 
-    def test_staff_user_admin_access(self, admin_user, client):
+    def test_staff_user_admin_access(self, authenticated_client):
         """Test that staff users can access admin."""
-        client.force_login(admin_user)
-        url = reverse("admin:index")
-        response = client.get(url)
+        url = admin_url("admin:index")
+        response = authenticated_client.get(url)
         assert response.status_code == 200
-        assert "Django administration" in response.content.decode("utf-8")
+        assert b"Django administration" in response.content
+
+
+@pytest.mark.django_db
+class TestApproxCountPaginator:
+    """Test the estimated-count paginator used by the large admin changelists."""
+
+    def test_falls_back_to_exact_count(self, multiple_activations):
+        """Test that the exact count is used when no estimate is available."""
+        paginator = ApproxCountPaginator(Activation.objects.order_by("pk"), 2)
+        assert paginator.count == 3
+        assert paginator.num_pages == 2
+
+    def test_filtered_queryset_uses_exact_count(self, multiple_activations):
+        """Test that filtered querysets are always counted exactly."""
+        multiple_activations[0].deactivate()
+        queryset = Activation.objects.filter(is_active=True).order_by("pk")
+        paginator = ApproxCountPaginator(queryset, 10)
+        assert paginator.count == 2
@@ -1,24 +1,103 @@
 """
 API tests for Centralized License Service
 """
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
 import pytest
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
 
+from licenses.cache import invalidate_cached_status
 from licenses.models import Activation, Brand, License, LicenseKey, Product
+from licenses.pagination import LicenseServicePagination
+from licenses.serializers import LicenseActivationSerializer, LicenseStatusSerializer
+from licenses.views import (
+    ACTIVATION_REQUEST_RULES,
+    STATUS_REQUEST_RULES,
+    BrandViewSet,
+    validate_service_request,
+)
 
+pytestmark = pytest.mark.nplus1
 
-@pytest.mark.django_db
-class TestBrandAPI:
-    """Test Brand API endpoints."""
+SERVICE_KEY = "12345678-90ab-4cde-8f01-234567890abc"
 
-    def test_list_brands(self, authenticated_api_client, brand):
-        """Test listing brands."""
-        url = "/api/brands/"
-        response = authenticated_api_client.get(url)
+
+@pytest.mark.django_db
+class TestListEndpoints:
+    """Test the plain list endpoints return the existing object."""
+
+    @pytest.mark.parametrize(
+        "endpoint,fixture,field,expected",
+        [
+            ("/api/brands/", "brand", "name", "Test Brand"),
+            ("/api/products/", "product", "name", "Test Product"),
+            (
+                "/api/license-keys/",
+                "license_key",
+                "key",
+                "12345678-90ab-4cde-8f01-234567890abc",
+            ),
+            (
+                "/api/activations/",
+                "activation",
+                "instance_identifier",
+                "https://test.example.com",
+            ),
+        ],
+    )
+    def test_list_endpoint(
+        self, authenticated_api_client, request, endpoint, fixture, field, expected
+    ):
+        """Test listing each resource."""
+        request.getfixturevalue(fixture)
+        response = authenticated_api_client.get(endpoint)
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
-        assert response.data["results"][0]["name"] == "Test Brand"
+        assert response.data["results"][0][field] == expected
+
+    @pytest.mark.parametrize(
+        "endpoint,fixture,field,expected",
+        [
+            ("/api/brands/", "brand", "name", "Test Brand"),
+            ("/api/products/", "product", "name", "Test Product"),
+            (
+                "/api/license-keys/",
+                "license",
+                "key",
+                "12345678-90ab-4cde-8f01-234567890abc",
+            ),
+        ],
+    )
+    def test_list_endpoint_sparse_fields(
+        self,
+        authenticated_api_client,
+        request,
+        django_assert_num_queries,
+        endpoint,
+        fixture,
+        field,
+        expected,
+    ):
+        """Test ?fields= trims the payload and skips unused count queries."""
+        request.getfixturevalue(fixture)
+        with django_assert_num_queries(2):
+            response = authenticated_api_client.get(endpoint, {"fields": f"id,{field}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        result = response.data["results"][0]
+        assert set(result) == {"id", field}
+        assert result[field] == expected
+
+
+@pytest.mark.django_db
+class TestBrandAPI:
+    """Test Brand API endpoints."""
 
     def test_create_brand(self, authenticated_api_client):
         """Test creating a brand."""
@@ -44,6 +123,20 @@ class TestBrandAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["name"] == "Test Brand"
 
+    def test_brand_product_count_invalidation(self, authenticated_api_client, product):
+        """Test the cached product count is refreshed when products change."""
+        url = f"/api/brands/{product.brand.id}/"
+        response = authenticated_api_client.get(url)
+        assert response.data["product_count"] == 1
+
+        Product.objects.create(name="Second", slug="second", brand=product.brand)
+        response = authenticated_api_client.get(url)
+        assert response.data["product_count"] == 2
+
+        product.delete()
+        response = authenticated_api_client.get(url)
+        assert response.data["product_count"] == 1
+
     def test_update_brand(self, authenticated_api_client, brand):
         """Test updating a brand."""
         url = f"/api/brands/{brand.id}/"
@@ -61,32 +154,11 @@ class TestBrandAPI:
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert Brand.objects.count() == 0
 
-    def test_unauthorized_access(self, api_client, brand):
-        """Test unauthorized access to brand endpoints."""
-        url = "/api/brands/"
-        response = api_client.get(url)
-
-        # The API returns 403 (Forbidden) when authentication is required
-        # This is correct behavior for DRF with IsAuthenticated permission
-        assert response.status_code in [
-            status.HTTP_401_UNAUTHORIZED,
-            status.HTTP_403_FORBIDDEN,
-        ]
-
 
 @pytest.mark.django_db
 class TestProductAPI:
     """Test Product API endpoints."""
 
-    def test_list_products(self, authenticated_api_client, product):
-        """Test listing products."""
-        url = "/api/products/"
-        response = authenticated_api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) == 1
-        assert response.data["results"][0]["name"] == "Test Product"
-
     def test_create_product(self, authenticated_api_client, brand):
         """Test creating a product."""
         url = "/api/products/"
@@ -125,15 +197,6 @@ class TestProductAPI:
 class TestLicenseKeyAPI:
     """Test License Key API endpoints."""
 
-    def test_list_license_keys(self, authenticated_api_client, license_key):
-        """Test listing license keys."""
-        url = "/api/license-keys/"
-        response = authenticated_api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) == 1
-        assert response.data["results"][0]["key"] == "TEST-LICENSE-KEY-12345"
-
     def test_create_license_key(self, authenticated_api_client, brand, product):
         """Test creating a license key."""
         url = "/api/license-keys/"
@@ -146,6 +209,66 @@ class TestLicenseKeyAPI:
         # Just verify the new license key was created
         assert LicenseKey.objects.filter(customer_email="new@test.com").exists()
 
+    def test_license_keys_by_email(self, authenticated_api_client, license):
+        """Test listing license keys by customer email."""
+        url = "/api/license-keys/by_email/"
+        response = authenticated_api_client.get(url, {"email": "test@example.com"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["total_seats"] == 5
+
+    def test_license_keys_by_email_case_insensitive(
+        self, authenticated_api_client, license
+    ):
+        """Test by_email matches emails regardless of case."""
+        url = "/api/license-keys/by_email/"
+        response = authenticated_api_client.get(url, {"email": "Test@Example.COM"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+
+    def test_license_keys_by_email_stream(
+        self, authenticated_api_client, license, expired_license
+    ):
+        """Test streaming a customer's licenses as a flat JSON array."""
+        url = "/api/license-keys/by_email/"
+        response = authenticated_api_client.get(
+            url, {"email": "test@example.com", "stream": "1"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        rows = json.loads(b"".join(response.streaming_content))
+        assert len(rows) == 2
+        assert rows[0]["key"] == str(license.license_key.key)
+        assert rows[0]["licenses__product__slug"] == "test-product"
+
+    def test_license_keys_by_email_query_count(
+        self,
+        authenticated_api_client,
+        license,
+        license_factory,
+        django_assert_num_queries,
+    ):
+        """Test nested counts do not add queries per license."""
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Product {i}", slug=f"product-{i}", brand=license.product.brand
+            )
+            license_factory(product=product, seats=1)
+        cache.clear()
+
+        url = "/api/license-keys/by_email/"
+        with django_assert_num_queries(6):
+            response = authenticated_api_client.get(url, {"email": "test@example.com"})
+
+        assert response.status_code == status.HTTP_200_OK
+        licenses = response.data["results"][0]["licenses"]
+        assert len(licenses) == 4
+        assert licenses[0]["product"]["license_count"] == 1
+        assert licenses[0]["license_key"]["license_count"] == 4
+
     def test_get_license_key_detail(self, authenticated_api_client, license_key):
         """Test getting detailed license key information."""
         url = f"/api/license-keys/{license_key.id}/"
@@ -155,6 +278,21 @@ class TestLicenseKeyAPI:
         assert "customer_email" in response.data
         assert "brand" in response.data
 
+    def test_get_license_key_detail_query_count(
+        self,
+        authenticated_api_client,
+        license,
+        expired_license,
+        django_assert_num_queries,
+    ):
+        """Test retrieving a key does not count related rows per license."""
+        url = f"/api/license-keys/{license.license_key_id}/"
+        with django_assert_num_queries(5):
+            response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["licenses"]) == 2
+
 
 @pytest.mark.django_db
 class TestLicenseAPI:
@@ -167,7 +305,28 @@ class TestLicenseAPI:
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
-        assert response.data["results"][0]["product"]["id"] == license.product.id
+        result = response.data["results"][0]
+        assert result["product_id"] == license.product.id
+        assert result["product_name"] == "Test Product"
+        assert result["brand_name"] == "Test Brand"
+        assert result["customer_email"] == "test@example.com"
+        assert result["available_seats"] == 5
+
+    def test_list_licenses_query_count(
+        self,
+        authenticated_api_client,
+        license,
+        expired_license,
+        django_assert_num_queries,
+    ):
+        """Test the narrowed list query loads no deferred fields per row."""
+        url = "/api/licenses/"
+        with django_assert_num_queries(2):
+            response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+        assert {r["brand_name"] for r in response.data["results"]} == {"Test Brand"}
 
     def test_create_license(self, authenticated_api_client, license_key, product):
         """Test creating a license."""
@@ -185,6 +344,23 @@ class TestLicenseAPI:
         # Just verify the new license was created
         assert License.objects.filter(seats=3).exists()
 
+    def test_create_license_invalid_fields(
+        self, authenticated_api_client, license_key, product
+    ):
+        """Test past expiration dates and zero seats are rejected per field."""
+        url = "/api/licenses/"
+        data = {
+            "license_key_id": license_key.id,
+            "product_id": product.id,
+            "seats": 0,
+            "expiration_date": "2000-01-01T00:00:00Z",
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "expiration_date" in response.data
+        assert "seats" in response.data
+
     def test_get_license(self, authenticated_api_client, license):
         """Test getting a specific license."""
         url = f"/api/licenses/{license.id}/"
@@ -210,6 +386,14 @@ class TestLicenseLifecycleAPI:
         assert response.data["success"] is True
         assert "License renewed successfully" in response.data["message"]
 
+    def test_renew_license_past_date(self, authenticated_api_client, license):
+        """Test license renewal rejects a past expiration date."""
+        url = f"/api/licenses/{license.id}/renew/"
+        data = {"new_expiration_date": "2000-01-01T00:00:00Z"}
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_suspend_license(self, authenticated_api_client, license):
         """Test license suspension."""
         url = f"/api/licenses/{license.id}/suspend/"
@@ -225,13 +409,9 @@ class TestLicenseLifecycleAPI:
         assert license.status == "suspended"
         assert license.suspension_reason == "Testing suspension"
 
-    def test_resume_license(self, authenticated_api_client, license):
+    def test_resume_license(self, authenticated_api_client, suspended_license):
         """Test license resumption."""
-        # First suspend the license
-        suspend_url = f"/api/licenses/{license.id}/suspend/"
-        authenticated_api_client.post(suspend_url, {"reason": "Testing"}, format="json")
-
-        # Then resume it
+        license = suspended_license
         resume_url = f"/api/licenses/{license.id}/resume/"
         response = authenticated_api_client.post(resume_url)
 
@@ -259,14 +439,12 @@ class TestLicenseLifecycleAPI:
         assert license.status == "cancelled"
         assert license.cancellation_reason == "Testing cancellation"
 
-    def test_invalid_lifecycle_transitions(self, authenticated_api_client, license):
+    def test_invalid_lifecycle_transitions(
+        self, authenticated_api_client, cancelled_license
+    ):
         """Test invalid lifecycle transitions."""
-        # Cancel the license first
-        cancel_url = f"/api/licenses/{license.id}/cancel/"
-        authenticated_api_client.post(cancel_url, {"reason": "Testing"}, format="json")
-
         # Try to renew cancelled license
-        renew_url = f"/api/licenses/{license.id}/renew/"
+        renew_url = f"/api/licenses/{cancelled_license.id}/renew/"
         response = authenticated_api_client.post(
             renew_url, {"new_expiration_date": "2026-12-31T00:00:00Z"}, format="json"
         )
@@ -278,18 +456,6 @@ class TestLicenseLifecycleAPI:
 class TestActivationAPI:
     """Test Activation API endpoints."""
 
-    def test_list_activations(self, authenticated_api_client, activation):
-        """Test listing activations."""
-        url = "/api/activations/"
-        response = authenticated_api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) == 1
-        assert (
-            response.data["results"][0]["instance_identifier"]
-            == "https://test.example.com"
-        )
-
     def test_create_activation(self, authenticated_api_client, license):
         """Test creating an activation."""
         url = "/api/activations/"
@@ -306,6 +472,19 @@ class TestActivationAPI:
             instance_identifier="https://newtest.example.com"
         ).exists()
 
+    def test_create_duplicate_activation(self, authenticated_api_client, activation):
+        """Test creating an activation that is already active."""
+        url = "/api/activations/"
+        data = {
+            "license_id": activation.license.id,
+            "instance_identifier": activation.instance_identifier,
+            "instance_type": "website",
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Activation.objects.count() == 1
+
     def test_get_activation(self, authenticated_api_client, activation):
         """Test getting a specific activation."""
         url = f"/api/activations/{activation.id}/"
@@ -339,56 +518,243 @@ class TestEnhancedSeatManagementAPI:
     ):
         """Test bulk seat deactivation."""
         url = "/api/activations/bulk_deactivate/"
+        ids = [activation.id for activation in multiple_activations]
+        data = {"activation_ids": ids, "reason": "Testing bulk deactivation"}
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response.data["success"] is True
+        assert "deactivated" in response.data["message"].lower()
+
+        # Verify all activations are deactivated
+        activations = Activation.objects.filter(pk__in=ids)
+        assert not activations.filter(is_active=True).exists()
+        assert not activations.exclude(
+            deactivation_reason="Testing bulk deactivation"
+        ).exists()
+
+    def test_bulk_deactivate_reports_errors(
+        self, authenticated_api_client, multiple_activations
+    ):
+        """Test bulk deactivation reports missing and inactive activations."""
+        multiple_activations[0].deactivate()
+        url = "/api/activations/bulk_deactivate/"
         data = {
-            "activation_ids": [activation.id for activation in multiple_activations],
+            "activation_ids": [a.id for a in multiple_activations] + [999999],
             "reason": "Testing bulk deactivation",
         }
         response = authenticated_api_client.post(url, data, format="json")
 
-        if response.status_code != status.HTTP_200_OK:
-            print(f"Response data: {response.data}")
-
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["success"] is True
-        assert "deactivated" in response.data["message"].lower()
+        assert response.data["deactivated_count"] == 2
+        assert response.data["errors"] == [
+            f"Activation {multiple_activations[0].id} is already deactivated",
+            "Activation 999999 not found or access denied",
+        ]
 
-        # Verify all activations are deactivated
-        for activation in multiple_activations:
-            activation.refresh_from_db()
-            assert activation.is_active is False
-
-    def test_reactivate_seat(self, authenticated_api_client, activation):
-        """Test seat reactivation."""
-        # First deactivate the seat
-        deactivate_url = f"/api/activations/{activation.id}/deactivate/"
-        authenticated_api_client.post(
-            deactivate_url, {"reason": "Testing"}, format="json"
+    def test_reactivate_seat(self, authenticated_api_client, deactivated_activation):
+        """Test a deactivated seat cannot be deactivated again."""
+        # There's no reactivate action, so the seat stays deactivated
+        url = f"/api/activations/{deactivated_activation.id}/deactivate/"
+        response = authenticated_api_client.post(
+            url, {"reason": "Again"}, format="json"
         )
 
-        # Since there's no reactivate action, just verify deactivation worked
-        activation.refresh_from_db()
-        assert activation.is_active is False
-        assert activation.deactivation_reason == "Testing"
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        deactivated_activation.refresh_from_db()
+        assert deactivated_activation.is_active is False
+        assert deactivated_activation.deactivation_reason == "Testing"
 
 
 @pytest.mark.django_db
 class TestLicenseServiceAPI:
     """Test License Service API endpoints."""
 
-    def test_check_license_status(self, authenticated_api_client, license):
+    def test_check_license_status(
+        self,
+        authenticated_api_client,
+        license,
+        django_assert_num_queries,
+        django_assert_max_num_queries,
+    ):
         """Test license status check."""
         url = "/api/service/check_status/"
+        # The fixture's key and product are cached by create(), not refetched
+        with django_assert_num_queries(0):
+            data = {
+                "license_key": license.license_key.key,
+                "product_slug": license.product.slug,
+            }
+        with django_assert_max_num_queries(3):
+            response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["valid"] is True
+        assert response.data["customer_email"] == "test@example.com"
+
+    def test_check_license_status_query_count(
+        self, api_client, license, multiple_activations, django_assert_num_queries
+    ):
+        """Test status checks load the key and its licenses in two queries."""
+        url = "/api/service/check_status/"
+        data = {"license_key": str(license.license_key.key)}
+        with django_assert_num_queries(2):
+            response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["brand"] == "Test Brand"
+        assert response.data["licenses"][0]["available_seats"] == 2
+
+    def test_check_license_status_product_slug(
+        self, api_client, license, django_assert_num_queries
+    ):
+        """Test product slugs are resolved without joining products each time."""
+        url = "/api/service/check_status/"
         data = {
-            "license_key": license.license_key.key,
+            "license_key": str(license.license_key.key),
             "product_slug": license.product.slug,
         }
-        response = authenticated_api_client.post(url, data, format="json")
+        api_client.post(url, data, format="json")
+        invalidate_cached_status(license.license_key_id)
 
+        with django_assert_num_queries(2):
+            response = api_client.post(url, data, format="json")
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["valid"] is True
-        assert response.data["customer_email"] == "test@example.com"
 
-    def test_activate_license(self, authenticated_api_client, license):
+        license.product.slug = "renamed-product"
+        license.product.save()
+        # Product changes do not touch status entries, only the cached ids
+        invalidate_cached_status(license.license_key_id)
+        response = api_client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_check_license_status_cached(
+        self, api_client, license, django_assert_num_queries
+    ):
+        """Test repeated status checks are served from the cache until a change."""
+        url = "/api/service/check_status/"
+        data = {"license_key": str(license.license_key.key)}
+        api_client.post(url, data, format="json")
+
+        with django_assert_num_queries(0):
+            response = api_client.post(url, data, format="json")
+        assert response.data["licenses"][0]["available_seats"] == 5
+
+        Activation.objects.create(
+            license=license, instance_identifier="https://new.example.com"
+        )
+        response = api_client.post(url, data, format="json")
+        assert response.data["licenses"][0]["available_seats"] == 4
+
+        license.suspend("Testing suspension")
+        response = api_client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_check_license_status_instance_info(self, api_client, activation):
+        """Test status checks report the matching instance activation."""
+        url = "/api/service/check_status/"
+        data = {
+            "license_key": str(activation.license.license_key.key),
+            "instance_identifier": activation.instance_identifier,
+        }
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        license_data = response.data["licenses"][0]
+        assert license_data["is_expired"] is False
+        assert license_data["available_seats"] == 4
+        assert license_data["instance_info"]["instance_type"] == "website"
+
+    @pytest.mark.parametrize("action", ["check_status", "activate"])
+    def test_invalid_key_format_skips_database(
+        self, api_client, django_assert_num_queries, action
+    ):
+        """Test malformed license keys are rejected without touching the DB."""
+        url = f"/api/service/{action}/"
+        data = {
+            "license_key": "not-a-uuid",
+            "product_slug": "test-product",
+            "instance_identifier": "https://service.example.com",
+        }
+        with django_assert_num_queries(0):
+            response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "license_key" in response.data
+
+    def test_activate_invalid_fields(self, api_client, django_assert_num_queries):
+        """Test service request field errors are reported per field."""
+        url = "/api/service/activate/"
+        data = {
+            "license_key": "12345678-90ab-4cde-8f01-234567890abc",
+            "product_slug": " ",
+            "instance_identifier": "x" * 501,
+        }
+        with django_assert_num_queries(0):
+            response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["product_slug"] == ["This field may not be blank."]
+        assert "instance_identifier" in response.data
+        assert "license_key" not in response.data
+
+    @pytest.mark.parametrize(
+        "serializer_class,rules,body",
+        [
+            (LicenseStatusSerializer, STATUS_REQUEST_RULES, {"license_key": ""}),
+            (LicenseStatusSerializer, STATUS_REQUEST_RULES, {"license_key": None}),
+            (LicenseStatusSerializer, STATUS_REQUEST_RULES, {"license_key": True}),
+            (LicenseStatusSerializer, STATUS_REQUEST_RULES, {}),
+            (LicenseStatusSerializer, STATUS_REQUEST_RULES, {"license_key": "x" * 256}),
+            (
+                LicenseStatusSerializer,
+                STATUS_REQUEST_RULES,
+                {"license_key": SERVICE_KEY, "product_slug": ""},
+            ),
+            (
+                LicenseStatusSerializer,
+                STATUS_REQUEST_RULES,
+                {"license_key": SERVICE_KEY, "instance_identifier": 123},
+            ),
+            (
+                LicenseActivationSerializer,
+                ACTIVATION_REQUEST_RULES,
+                {
+                    "license_key": f" {SERVICE_KEY} ",
+                    "product_slug": 1.5,
+                    "instance_identifier": "https://service.example.com",
+                },
+            ),
+            (
+                LicenseActivationSerializer,
+                ACTIVATION_REQUEST_RULES,
+                {"license_key": SERVICE_KEY, "instance_type": "  "},
+            ),
+        ],
+    )
+    def test_service_validation_matches_serializer(self, serializer_class, rules, body):
+        """Test the service request validator agrees with its serializer."""
+        serializer = serializer_class(data=body)
+        if serializer.is_valid():
+            assert validate_service_request(body, rules) == serializer.validated_data
+        else:
+            with pytest.raises(ValidationError) as excinfo:
+                validate_service_request(body, rules)
+            assert excinfo.value.detail == serializer.errors
+
+    @pytest.mark.parametrize("action", ["check_status", "activate"])
+    def test_service_request_body_must_be_object(self, api_client, action):
+        """Test a non-object JSON body is a 400, not a server error."""
+        response = api_client.post(f"/api/service/{action}/", [], format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["non_field_errors"] == [
+            "Invalid data. Expected a dictionary, but got list."
+        ]
+
+    def test_activate_license(
+        self, authenticated_api_client, license, django_assert_num_queries
+    ):
         """Test license activation."""
         url = "/api/service/activate/"
         data = {
@@ -397,28 +763,235 @@ class TestLicenseServiceAPI:
             "instance_identifier": "https://service.example.com",
             "instance_type": "website",
         }
-        response = authenticated_api_client.post(url, data, format="json")
+        # Product ids, locked license, existing activation check and INSERT,
+        # plus the SAVEPOINT/RELEASE pairs of the two atomic blocks.
+        with django_assert_num_queries(8):
+            response = authenticated_api_client.post(url, data, format="json")
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data["success"] is True
         assert response.data["activation_id"] is not None
+        assert response.data["available_seats"] == 4
+
+    @pytest.mark.parametrize(
+        "key,slug,error",
+        [
+            (
+                "00000000-0000-4000-8000-000000000000",
+                "test-product",
+                "Invalid or inactive license key",
+            ),
+            (None, "missing-product", "No valid license found for this product"),
+        ],
+    )
+    def test_activate_license_not_found(self, api_client, license, key, slug, error):
+        """Test activation reports unknown keys and missing licenses apart."""
+        url = "/api/service/activate/"
+        data = {
+            "license_key": key or str(license.license_key.key),
+            "product_slug": slug,
+            "instance_identifier": "https://service.example.com",
+            "instance_type": "website",
+        }
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["error"] == error
+
+    def test_activate_license_no_seats(self, api_client, license, activation):
+        """Test activation is refused once every seat is taken."""
+        License.objects.filter(pk=license.pk).update(seats=1)
+        url = "/api/service/activate/"
+        data = {
+            "license_key": str(license.license_key.key),
+            "product_slug": license.product.slug,
+            "instance_identifier": "https://other.example.com",
+            "instance_type": "website",
+        }
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "No available seats" in response.data["error"]
+
+        # The already activated instance is still reported as activated
+        data["instance_identifier"] = activation.instance_identifier
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["activation_id"] == activation.id
+
+    def test_provision_license(self, authenticated_api_client, product):
+        """Test provisioning a license through the brand API."""
+        url = "/api/service/provision/"
+        data = {
+            "customer_email": "new@example.com",
+            "brand_id": product.brand_id,
+            "product_id": product.id,
+            "seats": 2,
+            "expiration_date": "2099-01-01T00:00:00Z",
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert License.objects.get(id=response.data["license_id"]).seats == 2
+
+    def test_provision_rejects_before_querying(
+        self, authenticated_api_client, django_assert_num_queries
+    ):
+        """Test denied or incomplete provision requests skip the database."""
+        url = "/api/service/provision/"
+        with django_assert_num_queries(0):
+            response = APIClient().post(url, {}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        with django_assert_num_queries(0):
+            response = authenticated_api_client.post(url, {}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_provision_bulk(self, authenticated_api_client, license_key, product):
+        """Test bulk provisioning reuses existing keys and creates missing ones."""
+        url = "/api/service/provision_bulk/"
+        item = {
+            "brand_id": product.brand_id,
+            "product_id": product.id,
+            "expiration_date": "2099-01-01T00:00:00Z",
+        }
+        data = {
+            "licenses": [
+                {**item, "customer_email": license_key.customer_email, "seats": 3},
+                {**item, "customer_email": "new@example.com"},
+                {**item, "customer_email": "NEW@Example.com"},
+            ]
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["licenses"]) == 3
+        assert response.data["licenses"][0]["license_key"] == license_key.key
+        assert LicenseKey.objects.filter(customer_email="new@example.com").count() == 1
+        assert license_key.licenses.get().seats == 3
+
+    def test_provision_bulk_invalid_item(self, authenticated_api_client, product):
+        """Test bulk provisioning creates nothing when any item is invalid."""
+        url = "/api/service/provision_bulk/"
+        data = {
+            "licenses": [
+                {
+                    "customer_email": "new@example.com",
+                    "brand_id": product.brand_id,
+                    "product_id": product.id,
+                    "expiration_date": "2099-01-01T00:00:00Z",
+                },
+                {"customer_email": "new@example.com"},
+            ]
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not LicenseKey.objects.filter(customer_email="new@example.com").exists()
+
+    @pytest.mark.parametrize(
+        "field,value",
+        [
+            ("seats", "abc"),
+            ("seats", 0),
+            ("seats", -1),
+            ("expiration_date", "not-a-date"),
+            ("expiration_date", "2000-01-01T00:00:00Z"),
+            ("customer_email", "not-an-email"),
+        ],
+    )
+    def test_provision_bulk_rejects_invalid_values(
+        self, authenticated_api_client, product, field, value
+    ):
+        """Test malformed seats, dates and emails are a 400 naming the field."""
+        url = "/api/service/provision_bulk/"
+        item = {
+            "customer_email": "new@example.com",
+            "brand_id": product.brand_id,
+            "product_id": product.id,
+            "expiration_date": "2099-01-01T00:00:00Z",
+            field: value,
+        }
+        response = authenticated_api_client.post(
+            url, {"licenses": [item]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert field in response.data["licenses"][0]
+        assert not License.objects.exists()
+
+    def test_provision_invalid_product(self, authenticated_api_client, product):
+        """Test provisioning against another brand's product is rejected."""
+        other_brand = Brand.objects.create(name="Other Brand", slug="other-brand")
+        url = "/api/service/provision/"
+        data = {
+            "customer_email": "new@example.com",
+            "brand_id": other_brand.id,
+            "product_id": product.id,
+            "expiration_date": "2099-01-01T00:00:00Z",
+        }
+        response = authenticated_api_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 @pytest.mark.django_db
 class TestAPIPagination:
     """Test API pagination."""
 
-    def test_pagination(self, authenticated_api_client, large_dataset):
+    def test_pagination(
+        self, authenticated_api_client, large_dataset, django_assert_max_num_queries
+    ):
         """Test API pagination with large datasets."""
         url = "/api/brands/"
-        response = authenticated_api_client.get(url)
+        with django_assert_max_num_queries(4):
+            response = authenticated_api_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert "count" in response.data
         assert "next" in response.data
         assert "previous" in response.data
         assert "results" in response.data
-        assert len(response.data["results"]) <= 20  # Default page size
+        assert response.data["count"] == len(large_dataset["brands"]) + 1
+        assert response.data["next"] is not None
+        assert len(response.data["results"]) == 20  # Default page size
+
+    @pytest.mark.parametrize(
+        "url,max_queries",
+        [
+            ("/api/license-keys/", 6),
+            ("/api/licenses/", 2),
+            ("/api/activations/", 6),
+        ],
+    )
+    def test_paginated_list_query_count(
+        self,
+        authenticated_api_client,
+        large_dataset,
+        django_assert_max_num_queries,
+        url,
+        max_queries,
+    ):
+        """Test a full page of nested rows takes a constant number of queries."""
+        with django_assert_max_num_queries(max_queries):
+            response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == min(response.data["count"], 20)
+
+    def test_pagination_page_size_capped(self, authenticated_api_client, monkeypatch):
+        """Test the client-selected page size is capped at max_page_size."""
+        monkeypatch.setattr(LicenseServicePagination, "max_page_size", 2)
+        for i in range(3):
+            Brand.objects.create(name=f"Brand {i}", slug=f"brand-{i}")
+
+        url = "/api/brands/"
+        response = authenticated_api_client.get(url, {"page_size": 1000})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        assert len(response.data["results"]) == 2
 
 
 @pytest.mark.django_db
@@ -426,11 +999,16 @@ class TestAPIFiltering:
     """Test API filtering capabilities."""
 
     def test_filter_licenses_by_status(
-        self, authenticated_api_client, license, suspended_license
+        self,
+        authenticated_api_client,
+        license,
+        suspended_license,
+        django_assert_num_queries,
     ):
         """Test filtering licenses by status."""
         url = "/api/licenses/"
-        response = authenticated_api_client.get(url, {"status": "suspended"})
+        with django_assert_num_queries(2):
+            response = authenticated_api_client.get(url, {"status": "suspended"})
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
@@ -452,56 +1030,72 @@ class TestAPIFiltering:
 class TestAPISearch:
     """Test API search functionality."""
 
-    def test_search_brands(self, authenticated_api_client, brand):
+    def test_search_brands(
+        self, authenticated_api_client, brand, django_assert_num_queries
+    ):
         """Test searching brands by name."""
         url = "/api/brands/"
-        response = authenticated_api_client.get(url, {"search": "Test"})
+        # Count, page, and the primed product counts
+        with django_assert_num_queries(3):
+            response = authenticated_api_client.get(url, {"search": "Test"})
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
         assert "Test" in response.data["results"][0]["name"]
 
-    def test_search_products(self, authenticated_api_client, product):
+    def test_search_products(
+        self, authenticated_api_client, product, django_assert_num_queries
+    ):
         """Test searching products by name."""
         url = "/api/products/"
-        response = authenticated_api_client.get(url, {"search": "Product"})
+        # Count, page, and the primed brand and license counts
+        with django_assert_num_queries(4):
+            response = authenticated_api_client.get(url, {"search": "Product"})
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
         assert "Product" in response.data["results"][0]["name"]
 
 
-@pytest.mark.django_db
 class TestAPIErrorHandling:
     """Test API error handling."""
 
-    def test_invalid_data_creation(self, authenticated_api_client):
+    def test_invalid_data_creation(self, api_client):
         """Test creating objects with invalid data."""
+        # Validation rejects the payload before any query runs, so an
+        # unsaved admin is enough and the test needs no database.
+        api_client.force_authenticate(
+            user=get_user_model()(
+                username="testadmin", is_staff=True, is_superuser=True
+            )
+        )
         url = "/api/brands/"
         data = {"name": ""}  # Missing required fields
-        response = authenticated_api_client.post(url, data, format="json")
+        response = api_client.post(url, data, format="json")
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "name" in response.data
         assert "slug" in response.data  # slug is also required
 
-    def test_not_found_resource(self, authenticated_api_client):
+    @pytest.mark.django_db
+    def test_not_found_resource(self, api_view, admin_user):
         """Test accessing non-existent resources."""
-        url = "/api/brands/99999/"
-        response = authenticated_api_client.get(url)
+        response = api_view(BrandViewSet, "retrieve", user=admin_user, pk=99999)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
-    def test_method_not_allowed(self, authenticated_api_client, brand):
+    @pytest.mark.django_db
+    def test_method_not_allowed(self, api_view, admin_user, brand):
         """Test using unsupported HTTP methods."""
-        url = f"/api/brands/{brand.id}/"
-        response = authenticated_api_client.delete(
-            url
+        response = api_view(
+            BrandViewSet, "destroy", method="delete", user=admin_user, pk=brand.id
         )  # DELETE should be allowed for ModelViewSet
 
-        # Since DELETE is allowed, let's test with an invalid endpoint instead
-        invalid_url = "/api/brands/invalid-endpoint/"
-        response = authenticated_api_client.get(invalid_url)
+        # Since DELETE is allowed, let's test with an invalid endpoint instead;
+        # the router sends /api/brands/invalid-endpoint/ to retrieve
+        response = api_view(
+            BrandViewSet, "retrieve", user=admin_user, pk="invalid-endpoint"
+        )
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
@@ -510,24 +1104,21 @@ class TestAPIErrorHandling:
 class TestAPIAuthentication:
     """Test API authentication and permissions."""
 
-    def test_unauthenticated_access(self, api_client, brand):
-        """Test accessing protected endpoints without authentication."""
-        url = "/api/brands/"
-        response = api_client.get(url)
-
-        # DRF often returns 403 for unauthenticated access to protected endpoints
-        assert response.status_code in [
-            status.HTTP_401_UNAUTHORIZED,
-            status.HTTP_403_FORBIDDEN,
-        ]
-
-    def test_regular_user_access(self, regular_user, api_client, brand):
-        """Test regular user access to protected endpoints."""
-        api_client.force_authenticate(user=regular_user)
-        url = "/api/brands/"
-        response = api_client.get(url)
+    @pytest.mark.parametrize(
+        "user_fixture, expected_statuses",
+        [
+            # DRF often returns 403 for unauthenticated access
+            (None, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN]),
+            # Regular users can access brands but see filtered results
+            ("regular_user", [status.HTTP_200_OK]),
+        ],
+        ids=["anonymous", "regular_user"],
+    )
+    def test_brand_list_access(
+        self, request, api_view, brand, user_fixture, expected_statuses
+    ):
+        """Test brand list access with and without a regular user."""
+        user = request.getfixturevalue(user_fixture) if user_fixture else None
+        response = api_view(BrandViewSet, "list", user=user)
 
-        # Regular users can access brands but see filtered results
-        assert response.status_code == status.HTTP_200_OK
-        # They should only see active brands
-        assert len(response.data["results"]) >= 0  # At least empty results
+        assert response.status_code in expected_statuses
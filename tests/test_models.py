@@ -2,13 +2,32 @@
 Model tests for Centralized License Service
 """
 from datetime import timedelta
+from importlib import import_module
 
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Value
 from django.utils import timezone
 
 import pytest
 
-from licenses.models import Activation, Brand, License, LicenseKey, Product
+from licenses.cache import get_status_version
+from licenses.models import (
+    Activation,
+    Brand,
+    License,
+    LicenseKey,
+    Product,
+    bulk_refresh_seat_counts,
+    product_ids_by_slug,
+)
+from users.backends import UserBackend
+
+User = get_user_model()
+
+pytestmark = pytest.mark.nplus1
 
 
 @pytest.mark.django_db
@@ -33,13 +52,6 @@ class TestBrand:
         assert brand.products.count() == 1
         assert brand.products.first() == product
 
-    def test_brand_validation(self):
-        """Test brand validation."""
-        # Test required fields
-        with pytest.raises(ValidationError):
-            brand = Brand()
-            brand.full_clean()
-
 
 @pytest.mark.django_db
 class TestProduct:
@@ -84,11 +96,17 @@ class TestProduct:
             )
             product.full_clean()
 
-    def test_product_validation(self):
-        """Test product validation."""
-        with pytest.raises(ValidationError):
-            product = Product()
-            product.full_clean()
+    def test_product_ids_by_slug_follow_product_changes(self, brand):
+        """Test cached slug lookups see products created and renamed later."""
+        assert product_ids_by_slug("new-product") == ()
+
+        product = Product.objects.create(name="New", slug="new-product", brand=brand)
+        assert product_ids_by_slug("new-product") == (product.id,)
+
+        product.slug = "renamed-product"
+        product.save()
+        assert product_ids_by_slug("new-product") == ()
+        assert product_ids_by_slug("renamed-product") == (product.id,)
 
 
 @pytest.mark.django_db
@@ -97,16 +115,24 @@ class TestLicenseKey:
 
     def test_license_key_creation(self, license_key):
         """Test license key creation with valid data."""
-        assert license_key.key == "TEST-LICENSE-KEY-12345"
+        assert str(license_key.key) == "12345678-90ab-4cde-8f01-234567890abc"
         assert license_key.brand == license_key.brand
         assert license_key.customer_email == "test@example.com"
         assert license_key.is_active is True
         assert license_key.created_at is not None
         assert license_key.updated_at is not None
 
+    def test_license_key_email_lowercased(self, brand):
+        """Test license key emails are stored lowercased."""
+        license_key = LicenseKey.objects.create(
+            brand=brand, customer_email="Mixed.Case@Example.com"
+        )
+        license_key.refresh_from_db()
+        assert license_key.customer_email == "mixed.case@example.com"
+
     def test_license_key_str_representation(self, license_key):
         """Test license key string representation."""
-        assert "TEST-LIC" in str(license_key)
+        assert "12345678..." in str(license_key)
         assert "test@example.com" in str(license_key)
 
     def test_license_key_licenses_relationship(self, license_key, license):
@@ -123,18 +149,37 @@ class TestLicenseKey:
         """Test license key total seats method."""
         assert license_key.get_total_seats() == 5
 
+    def test_license_key_get_total_seats_single_query(
+        self, license_key, license, expired_license, django_assert_num_queries
+    ):
+        """Test total seats are summed in one query for any license count."""
+        with django_assert_num_queries(1):
+            assert license_key.get_total_seats() == 8
+
+    def test_license_key_get_total_seats_without_licenses(self, license_key):
+        """Test license key total seats method with no licenses."""
+        assert license_key.get_total_seats() == 0
+
+    def test_license_key_get_available_seats(
+        self, license_key, license, expired_license, multiple_activations
+    ):
+        """Test license key available seats method."""
+        # 5 seats with 3 active activations, plus 3 unused seats
+        assert license_key.get_available_seats() == 5
+
+    def test_license_key_get_available_seats_single_query(
+        self, license_key, license, expired_license, django_assert_num_queries
+    ):
+        """Test available seats are aggregated in one query for any license count."""
+        with django_assert_num_queries(1):
+            assert license_key.get_available_seats() == 8
+
     def test_license_key_expiration_validation(self):
         """Test license key expiration validation."""
         # LicenseKey doesn't have expiration validation, so this test is not applicable
         # The expiration is handled at the License level
         pass
 
-    def test_license_key_validation(self):
-        """Test license key validation."""
-        with pytest.raises(ValidationError):
-            license_key = LicenseKey()
-            license_key.full_clean()
-
 
 @pytest.mark.django_db
 class TestLicense:
@@ -159,6 +204,23 @@ class TestLicense:
         """Test license available seats method."""
         assert license.available_seats == 4
 
+    def test_license_available_seats_with_used_seats(
+        self, license, multiple_activations
+    ):
+        """Test available seats read from the with_used_seats annotation."""
+        annotated = License.objects.with_used_seats().get(pk=license.pk)
+        assert annotated._used_seats == 3
+        assert annotated.available_seats == 2
+
+    def test_license_available_seats_with_prefetched_activations(
+        self, license, multiple_activations, django_assert_num_queries
+    ):
+        """Test available seats read from bulk-prefetched activations."""
+        multiple_activations[0].deactivate()
+        licenses = bulk_refresh_seat_counts(list(License.objects.all()))
+        with django_assert_num_queries(0):
+            assert licenses[0].available_seats == 3
+
     def test_license_is_expired(self, license):
         """Test license expiration check."""
         assert not license.is_expired
@@ -181,6 +243,38 @@ class TestLicense:
         assert license.suspension_reason == "Testing suspension"
         assert license.suspended_at is not None
 
+    def test_license_suspend_saves_only_changed_fields(self, license):
+        """Test suspension does not overwrite columns changed elsewhere."""
+        License.objects.filter(pk=license.pk).update(seats=9)
+        license.suspend("Testing suspension")
+
+        license.refresh_from_db()
+        assert license.status == "suspended"
+        assert license.seats == 9
+
+    def test_license_suspend_stale_status(self, license):
+        """Test a stale instance cannot suspend a license cancelled elsewhere."""
+        License.objects.filter(pk=license.pk).update(status="cancelled")
+
+        with pytest.raises(ValueError, match="status: cancelled"):
+            license.suspend("Testing suspension")
+
+        license.refresh_from_db()
+        assert license.status == "cancelled"
+        assert license.suspended_at is None
+
+    def test_license_renew_twice_keeps_original_expiration(self, license):
+        """Test repeated renewals keep the first original expiration date."""
+        original_expiration = license.expiration_date
+        license.renew(original_expiration + timedelta(days=30))
+        License.objects.filter(pk=license.pk).update(status="valid")
+        license.status = "valid"
+        license.renew(original_expiration + timedelta(days=60))
+
+        license.refresh_from_db()
+        assert license.renewal_count == 2
+        assert license.original_expiration_date == original_expiration
+
     def test_license_resume(self, license):
         """Test license resumption functionality."""
         license.suspend("Testing suspension")
@@ -198,6 +292,19 @@ class TestLicense:
         assert license.cancellation_reason == "Testing cancellation"
         assert license.cancelled_at is not None
 
+    def test_license_bulk_expire(
+        self, license, expired_license, suspended_license, django_assert_num_queries
+    ):
+        """Test bulk expiry of licenses past their expiration date."""
+        with django_assert_num_queries(1):
+            assert License.bulk_expire() == 1
+
+        expired_license.refresh_from_db()
+        license.refresh_from_db()
+        assert expired_license.status == "expired"
+        assert license.status == "valid"
+        assert License.bulk_expire() == 0
+
     def test_license_invalid_status_transitions(self, license):
         """Test invalid license status transitions."""
         # Test renewing cancelled license
@@ -209,12 +316,6 @@ class TestLicense:
         with pytest.raises(ValueError):
             license.suspend("Testing suspension")
 
-    def test_license_validation(self):
-        """Test license validation."""
-        with pytest.raises(ValidationError):
-            license = License()
-            license.full_clean()
-
 
 @pytest.mark.django_db
 class TestActivation:
@@ -242,6 +343,22 @@ class TestActivation:
         assert activation.deactivation_reason == "Testing deactivation"
         assert activation.deactivated_at is not None
 
+    def test_activation_bulk_deactivate(
+        self, multiple_activations, django_assert_num_queries
+    ):
+        """Test bulk deactivation of activations in a single update."""
+        activations = Activation.objects.filter(
+            id__in=[a.id for a in multiple_activations]
+        )
+        # One read of the affected license keys, then the single UPDATE
+        with django_assert_num_queries(2):
+            assert Activation.bulk_deactivate(activations, "Testing") == 3
+
+        for activation in multiple_activations:
+            activation.refresh_from_db()
+            assert activation.is_active is False
+            assert activation.deactivation_reason == "Testing"
+
     def test_activation_reactivate(self, activation):
         """Test activation reactivation functionality."""
         activation.deactivate("Testing deactivation")
@@ -249,51 +366,104 @@ class TestActivation:
         # # so this test is not applicable
         pass
 
-    def test_activation_validation(self):
-        """Test activation validation."""
+
+class TestModelValidation:
+    """Test required-field validation shared by all models.
+
+    No django_db mark: the unique checks are the only part of full_clean()
+    that queries, and an empty instance is rejected before they matter.
+    """
+
+    @pytest.mark.parametrize("model", [Brand, Product, LicenseKey, License, Activation])
+    def test_model_validation(self, model):
+        """Test an empty instance fails validation."""
         with pytest.raises(ValidationError):
-            activation = Activation()
-            activation.full_clean()
+            model().full_clean(validate_unique=False)
 
 
 @pytest.mark.django_db
 class TestModelRelationships:
     """Test model relationships and constraints."""
 
-    def test_brand_product_relationship(self, brand, product):
+    def test_brand_product_relationship(
+        self, brand, product, django_assert_num_queries
+    ):
         """Test brand-product relationship."""
-        assert product.brand == brand
-        assert brand.products.count() == 1
-        assert brand.products.first() == product
-
-    def test_product_license_key_relationship(self, product, license_key):
+        # The forward relation is cached by the fixture; count and first query
+        with django_assert_num_queries(2):
+            assert product.brand == brand
+            assert brand.products.count() == 1
+            assert brand.products.first() == product
+
+    def test_product_license_key_relationship(
+        self, product, license_key, django_assert_num_queries
+    ):
         """Test product-license key relationship."""
         # LicenseKey doesn't have direct relationship to Product
         # The relationship is through License
-        assert license_key.brand == product.brand
+        with django_assert_num_queries(0):
+            assert license_key.brand == product.brand
 
-    def test_license_key_license_relationship(self, license_key, license):
+    def test_license_key_license_relationship(
+        self, license_key, license, django_assert_num_queries
+    ):
         """Test license key-license relationship."""
-        assert license.license_key == license_key
-        assert license_key.licenses.count() == 1
-        assert license_key.licenses.first() == license
-
-    def test_license_activation_relationship(self, license, activation):
+        with django_assert_num_queries(2):
+            assert license.license_key == license_key
+            assert license_key.licenses.count() == 1
+            assert license_key.licenses.first() == license
+
+    def test_license_activation_relationship(
+        self, license, activation, django_assert_num_queries
+    ):
         """Test license-activation relationship."""
-        assert activation.license == license
-        assert license.activations.count() == 1
-        assert license.activations.first() == activation
-
-    def test_cascade_deletion(self, brand, product, license_key, license, activation):
+        with django_assert_num_queries(2):
+            assert activation.license == license
+            assert license.activations.count() == 1
+            assert license.activations.first() == activation
+
+    def test_cascade_deletion(
+        self,
+        brand,
+        product,
+        license_key,
+        license,
+        activation,
+        django_assert_num_queries,
+    ):
         """Test cascade deletion behavior."""
         # Delete brand should cascade to all related objects
         brand.delete()
 
-        # Verify all related objects are deleted
-        assert Product.objects.count() == 0
-        assert LicenseKey.objects.count() == 0
-        assert License.objects.count() == 0
-        assert Activation.objects.count() == 0
+        # Verify all related objects are deleted, checking every table at once
+        leftovers = [
+            model.objects.order_by().values_list(Value(model.__name__), "pk")
+            for model in (Product, LicenseKey, License, Activation)
+        ]
+        with django_assert_num_queries(1):
+            remaining = list(leftovers[0].union(*leftovers[1:], all=True))
+        assert remaining == []
+
+    def test_license_cascade_skips_activation_lookups(
+        self, license, django_assert_num_queries
+    ):
+        """Test cascade-deleting activations does not load their license each."""
+        Activation.objects.bulk_create(
+            Activation(license=license, instance_identifier=f"instance-{i}")
+            for i in range(20)
+        )
+        # Collect the activations, delete them, then delete the license
+        with django_assert_num_queries(3):
+            license.delete()
+        assert not Activation.objects.exists()
+
+    def test_activation_delete_invalidates_status(self, activation):
+        """Test deleting a reloaded activation still invalidates its key."""
+        license_key_id = activation.license.license_key_id
+        version = get_status_version(license_key_id)
+
+        Activation.objects.get(pk=activation.pk).delete()
+        assert get_status_version(license_key_id) > version
 
 
 @pytest.mark.django_db
@@ -308,25 +478,26 @@ class TestModelPerformance:
         assert len(large_dataset["activations"]) == 50
 
     @pytest.mark.slow
-    def test_large_dataset_queries(self, large_dataset):
+    def test_large_dataset_queries(self, large_dataset, django_assert_num_queries):
         """Test query performance with large datasets."""
-        # Test brand queries
         brand = large_dataset["license_keys"][0].brand
-        products = brand.products.all()
-        assert products.count() == 1
 
-        # Test product queries
-        product = products.first()
-        licenses = product.licenses.all()
-        assert licenses.count() == 10
+        # One query per level: products, their licenses, their activations
+        with django_assert_num_queries(3):
+            products = list(brand.products.prefetch_related("licenses__activations"))
+
+        with django_assert_num_queries(0):
+            # Test brand queries
+            assert len(products) == 1
 
-        # Test license queries
-        licenses = product.licenses.all()
-        assert licenses.count() == 10
+            # Test product queries
+            licenses = products[0].licenses.all()
+            assert len(licenses) == 10
 
-        # Test activation queries
-        activations = Activation.objects.filter(license__in=licenses)
-        assert activations.count() == 50
+            # Test activation queries
+            activations = [a for lic in licenses for a in lic.activations.all()]
+            assert len(activations) == 50
+            assert all(a.license.product is products[0] for a in activations)
 
 
 @pytest.mark.django_db
@@ -336,12 +507,14 @@ class TestModelBusinessRules:
     def test_license_seat_limit(self, license):
         """Test license seat limit enforcement."""
         # Create activations up to the limit
-        for i in range(5):
-            Activation.objects.create(
+        Activation.objects.bulk_create(
+            Activation(
                 license=license,
                 instance_identifier=f"https://test{i}.example.com",
                 instance_type="website",
             )
+            for i in range(license.seats)
+        )
 
         # Verify seat limit is enforced
         assert license.available_seats == 0
@@ -378,3 +551,40 @@ class TestModelBusinessRules:
                 instance_identifier="https://unique.example.com",
                 instance_type="website",
             )
+
+    def test_user_email_unique_ignoring_case(self, regular_user):
+        """Test two users cannot share an email in any letter case."""
+        with pytest.raises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username="other", email="USER@test.com")
+
+    def test_unique_email_migration_lists_duplicates(self, regular_user):
+        """Test the email constraint migration names clashing users up front."""
+        migration = import_module("users.migrations.0006_unique_email")
+        migration.check_duplicate_emails(django_apps, None)
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "users_email_ci_uniq"')
+        duplicate = User.objects.create_user(username="dupe", email="USER@test.com")
+        with pytest.raises(RuntimeError) as excinfo:
+            migration.check_duplicate_emails(django_apps, None)
+        assert f"user@test.com: {regular_user.pk}, {duplicate.pk}" in str(excinfo.value)
+
+    def test_users_without_email_allowed(self):
+        """Test the email uniqueness does not apply to blank emails."""
+        User.objects.create_user(username="first")
+        User.objects.create_user(username="second")
+        assert User.objects.filter(email="").count() == 2
+
+    def test_session_user_defers_address(self, regular_user):
+        """Test the auth backend loads request users without their address."""
+        user = UserBackend().get_user(regular_user.pk)
+        assert user == regular_user
+        assert "address" in user.get_deferred_fields()
+        assert "password" not in user.get_deferred_fields()
+
+    def test_user_refresh_reloads_address(self, regular_user):
+        """Test plain user loads and refreshes include the address."""
+        User.objects.filter(pk=regular_user.pk).update(address="1 Main Street")
+        regular_user.refresh_from_db()
+        assert regular_user.address == "1 Main Street"
+        assert not User.objects.get(pk=regular_user.pk).get_deferred_fields()
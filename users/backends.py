@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+User = get_user_model()
+
+
+class UserBackend(ModelBackend):
+    """
+    Model backend that loads session users without their ``address``.
+
+    ``get_user`` runs on every authenticated request, and nothing on that path
+    reads the free-text address; it is fetched on first access if needed.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.defer("address").get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-14 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["is_license_admin", "is_active", "-date_joined"],
+                name="users_is_lice_ac6767_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["company_name"], name="users_company_2f3199_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Columns searched by the user admin ``search_fields``. The admin search uses
+# ``icontains``, which PostgreSQL renders as ``UPPER(col::text) LIKE``, so the
+# trigram indexes are built on that expression.
+TABLE = "users"
+SEARCH_COLUMNS = ("username", "first_name", "last_name", "email", "company_name")
+
+
+def index_name(column):
+    return f"{TABLE}_{column}_trgm"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(column)} "
+            f"ON {TABLE} USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(column)}")
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("users", "0002_admin_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
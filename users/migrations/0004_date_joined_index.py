@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-14 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0003_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["date_joined"], name="users_date_jo_0c802f_idx"),
+        ),
+    ]
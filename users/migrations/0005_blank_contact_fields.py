@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-14 07:25
+
+from django.db import migrations, models
+
+CONTACT_FIELDS = ("company_name", "phone_number", "address")
+
+
+def blank_null_contact_fields(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    for field in CONTACT_FIELDS:
+        User.objects.filter(**{f"{field}__isnull": True}).update(**{field: ""})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_date_joined_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_null_contact_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="user",
+            name="address",
+            field=models.TextField(blank=True, default="", help_text="Full address"),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="company_name",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Company or organization name",
+                max_length=255,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="phone_number",
+            field=models.CharField(
+                blank=True, default="", help_text="Contact phone number", max_length=20
+            ),
+        ),
+    ]
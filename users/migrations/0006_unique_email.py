@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-14 07:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Stop with the conflicting user ids if any emails clash ignoring case."""
+    User = apps.get_model("users", "User")
+    users = User.objects.exclude(email="").annotate(email_lower=Lower("email"))
+    duplicates = (
+        users.order_by()
+        .values("email_lower")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("email_lower", flat=True)
+    )
+    conflicts = {}
+    for email, pk in (
+        users.filter(email_lower__in=duplicates)
+        .order_by("email_lower", "id")
+        .values_list("email_lower", "id")
+    ):
+        conflicts.setdefault(email, []).append(str(pk))
+    if conflicts:
+        details = "; ".join(
+            f"{email}: {', '.join(ids)}" for email, ids in conflicts.items()
+        )
+        raise RuntimeError(
+            "Cannot add users_email_ci_uniq: these users share an email ignoring "
+            f"case. Merge them or change their emails, then migrate again. {details}"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0005_blank_contact_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("email", ""), _negated=True),
+                name="users_email_ci_uniq",
+                violation_error_message="A user with that email already exists.",
+            ),
+        ),
+    ]
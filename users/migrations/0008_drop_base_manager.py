@@ -0,0 +1,16 @@
+# Generated by Django 5.1.2 on 2026-10-14 07:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0007_user_default_manager"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="user",
+            options={"verbose_name": "User", "verbose_name_plural": "Users"},
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 
@@ -13,15 +15,15 @@ class User(AbstractUser):
     company_name = models.CharField(
         max_length=255,
         blank=True,
-        null=True,
+        default="",
         help_text=_("Company or organization name"),
     )
 
     phone_number = models.CharField(
-        max_length=20, blank=True, null=True, help_text=_("Contact phone number")
+        max_length=20, blank=True, default="", help_text=_("Contact phone number")
     )
 
-    address = models.TextField(blank=True, null=True, help_text=_("Full address"))
+    address = models.TextField(blank=True, default="", help_text=_("Full address"))
 
     is_license_admin = models.BooleanField(
         default=False, help_text=_("Designates whether this user can manage licenses")
@@ -34,6 +36,22 @@ class User(AbstractUser):
         verbose_name = _("User")
         verbose_name_plural = _("Users")
         db_table = "users"
+        indexes = [
+            # Admin changelist: filtered by these flags, newest first
+            models.Index(fields=["is_license_admin", "is_active", "-date_joined"]),
+            # Default ordering and the date_joined sidebar ranges
+            models.Index(fields=["date_joined"]),
+            models.Index(fields=["company_name"]),
+        ]
+        constraints = [
+            # Non-admin license access is scoped by email, so it must be unique
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~Q(email=""),
+                name="users_email_ci_uniq",
+                violation_error_message=_("A user with that email already exists."),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.email})"